@@ -0,0 +1,136 @@
+import numpy as np
+
+from eml4806.graphics.shape import Polyline
+from eml4806.graphics.style import Color, Style
+
+##############################################################################################
+
+# Forward simulation with the batched kernels of the odometers (kinematics/step), one
+# vectorized step over B candidates per predicted tick.
+
+def _limits(odometer):
+    vmax = np.inf if odometer.maximum_linear_velocity is None else odometer.maximum_linear_velocity
+    wmax = np.inf if odometer.maximum_angular_velocity is None else odometer.maximum_angular_velocity
+    return vmax, wmax
+
+def _start(pose, count):
+    p = np.broadcast_to(np.asarray(pose, dtype=float).reshape(-1, 3), (count, 3))
+    return p[:, 0].copy(), p[:, 1].copy(), p[:, 2].copy()
+
+def rollout(odometer, pose, commands, dt, tol=1e-3):
+    """
+    Poses after each step of open-loop wheel-speed sequences started from pose.
+    commands is (H, 2) or (B, H, 2), the result (H, 3) or (B, H, 3).
+    """
+    u = np.asarray(commands, dtype=float)
+    single = u.ndim == 2
+    u = u.reshape(-1, u.shape[-2], 2)
+    B, H = u.shape[:2]
+    scheme = type(odometer)
+    vmax, wmax = _limits(odometer)
+    v, w = scheme.kinematics(u[:, :, 0], u[:, :, 1], odometer.track_width, vmax, wmax)
+    x, y, theta = _start(pose, B)
+    poses = np.empty((B, H, 3), dtype=float)
+    for k in range(H):
+        x, y, theta = scheme.step(x, y, theta, v[:, k], w[:, k], dt, tol)
+        poses[:, k, 0] = x
+        poses[:, k, 1] = y
+        poses[:, k, 2] = theta
+    return poses[0] if single else poses
+
+def simulate(odometer, pose, policy, steps, dt, tol=1e-3):
+    """
+    Closed-loop rollout: policy(x, y, theta) maps (B,) pose arrays to (B,) wheel speeds
+    (vl, vr) every step. pose is (3,) or (B, 3), the result (B, H, 3).
+    """
+    scheme = type(odometer)
+    vmax, wmax = _limits(odometer)
+    B = np.asarray(pose, dtype=float).reshape(-1, 3).shape[0]
+    x, y, theta = _start(pose, B)
+    poses = np.empty((B, int(steps), 3), dtype=float)
+    for k in range(int(steps)):
+        vl, vr = policy(x, y, theta)
+        v, w = scheme.kinematics(np.asarray(vl, dtype=float), np.asarray(vr, dtype=float),
+                                 odometer.track_width, vmax, wmax)
+        x, y, theta = scheme.step(x, y, theta, v, w, dt, tol)
+        poses[:, k, 0] = x
+        poses[:, k, 1] = y
+        poses[:, k, 2] = theta
+    return poses
+
+##############################################################################################
+
+def fan(vl, vr, count, horizon, spread, vmax=np.inf):
+    """
+    (B, H, 2) constant candidate sequences that turn by up to +/- spread (m/s of wheel
+    speed difference) around the (vl, vr) command, clipped to vmax.
+    """
+    d = np.linspace(-spread, spread, int(count))[:, None]
+    u = np.empty((int(count), int(horizon), 2), dtype=float)
+    u[:, :, 0] = vl - d
+    u[:, :, 1] = vr + d
+    return np.clip(u, -vmax, vmax, out=u)
+
+class PredictiveController:
+    """
+    Sampling model-predictive controller.
+    Every tick B candidate sequences are rolled out together over H steps, scored by
+    cost(poses (B, H, 3), commands (B, H, 2)) -> (B,) and the first command of the best one
+    is applied.
+    """
+
+    def __init__(self, odometer, horizon, dt, cost):
+        self.odometer = odometer
+        self.horizon = int(horizon)
+        self.dt = float(dt)
+        self.cost = cost
+        # Winner of the last tick
+        self.commands = None
+        self.poses = None
+        self.scores = None
+
+    def command(self, pose, candidates):
+        u = np.asarray(candidates, dtype=float).reshape(-1, self.horizon, 2)
+        poses = rollout(self.odometer, pose, u, self.dt)
+        self.scores = np.asarray(self.cost(poses, u), dtype=float)
+        best = int(np.argmin(self.scores))
+        self.commands = u[best]
+        self.poses = poses[best]
+        vl, vr = self.commands[0]
+        return float(vl), float(vr)
+
+##############################################################################################
+
+class Lookahead:
+    """
+    Predicted path of a robot over the next H ticks, drawn as one reused line.
+    """
+
+    def __init__(self, workspace, odometer, horizon=20, dt=0.1, style=Style.pen(Color(0.0, 0.6, 0.0), 0.75, 2.0)):
+        self.odometer = odometer
+        self.horizon = int(horizon)
+        self.dt = float(dt)
+        self.poses = np.zeros((0, 3), dtype=float)
+        self.line = Polyline(workspace, [], style=style)
+
+    # Open loop, the current command held for H ticks
+    def hold(self, vl, vr):
+        u = np.empty((self.horizon, 2), dtype=float)
+        u[:] = (vl, vr)
+        return self.show(rollout(self.odometer, self.odometer.pose(), u, self.dt))
+
+    # Closed loop, see simulate
+    def follow(self, policy):
+        return self.show(simulate(self.odometer, self.odometer.pose(), policy, self.horizon, self.dt)[0])
+
+    def show(self, poses):
+        # The line starts at the robot
+        self.poses = np.asarray(poses, dtype=float).reshape(-1, 3)
+        self.line.setPoints(np.vstack((self.odometer.position(), self.poses[:, :2])))
+        return self.poses
+
+    def setVisible(self, visible):
+        if visible:
+            self.line.show()
+        else:
+            self.line.hide()
@@ -0,0 +1,47 @@
+import numpy as np
+
+##############################################################################################
+
+class PDController:
+    """
+    Proportional-derivative wheel-speed controller for N robots at once.
+
+    Each tick the tracking error of every robot (an (N, 2) array, target minus position) is
+    turned into left/right wheel speeds
+        vl = speed + kp*e[:, 0] + kd*de[:, 0]/dt
+        vr = speed + kp*e[:, 1] + kd*de[:, 1]/dt
+    clipped to the motor limit vmax. Gains, cruise speed and limits may be scalars or (N,)
+    arrays (per-robot). The previous error is kept per robot in an (N, 2) array.
+    """
+
+    def __init__(self, count=1, speed=0.0, kp=0.0, kd=0.0, vmax=np.inf):
+        self.count = int(count)
+        self.speed = self._column(speed)
+        self.kp = self._column(kp)
+        self.kd = self._column(kd)
+        self.vmax = self._column(vmax)
+        self.last_error = np.zeros((self.count, 2), dtype=float)
+
+    def reset(self, rows=None):
+        if rows is None:
+            self.last_error[:] = 0.0
+        else:
+            self.last_error[rows] = 0.0
+
+    def command(self, error, dt):
+        e = np.asarray(error, dtype=float)
+        single = e.ndim == 1
+        e = e.reshape(self.count, 2)
+        de = (e - self.last_error) / dt
+        self.last_error[:] = e
+        vl = self.speed + self.kp * e[:, 0] + self.kd * de[:, 0]
+        vr = self.speed + self.kp * e[:, 1] + self.kd * de[:, 1]
+        # Motors physical limits
+        np.clip(vl, -self.vmax, self.vmax, out=vl)
+        np.clip(vr, -self.vmax, self.vmax, out=vr)
+        if single:
+            return float(vl[0]), float(vr[0])
+        return vl, vr
+
+    def _column(self, value):
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.count,)).copy()
@@ -0,0 +1,241 @@
+import os
+import math
+import shutil
+import tempfile
+import weakref
+import numpy as np
+
+##############################################################################################
+
+# Layers of a field map
+OCCUPANCY = "occupancy"   # uint8, 0 free, 1 obstacle
+GRASS     = "grass"       # uint8, grass type code
+DISTANCE  = "distance"    # float32, distance to the nearest obstacle (m), capped
+
+_DTYPES = {OCCUPANCY: np.uint8, GRASS: np.uint8, DISTANCE: np.float32}
+
+##############################################################################################
+
+class FieldMap:
+    """
+    Occupancy and grass-type grid over the workspace bounds.
+
+    Cells are square (resolution in m) and indexed [row, col] with row 0 at ymin and col 0 at
+    xmin. Every layer is stored as a tiled np.memmap shaped (tile rows, tile cols, T, T), so each
+    tile is contiguous on disk and fields larger than memory are paged in as they are touched.
+    Writes bump a per-tile version counter; the distance transform and renderers compare
+    against the versions they last saw to work on dirty tiles only.
+    Points outside the field are reported as occupied.
+
+    Without a folder the layers live in a temporary folder owned by the map, removed by
+    close() (or the with block, or when the map is garbage collected).
+    """
+
+    def __init__(self, xmin, xmax, ymin, ymax, resolution=0.05, tile=256, folder=None):
+        self.xmin = float(xmin)
+        self.ymin = float(ymin)
+        self.resolution = float(resolution)
+        self.tile = int(tile)
+        self.cols = int(math.ceil((xmax - xmin) / resolution - 1e-9))
+        self.rows = int(math.ceil((ymax - ymin) / resolution - 1e-9))
+        self.xmax = self.xmin + self.cols * self.resolution
+        self.ymax = self.ymin + self.rows * self.resolution
+        self.tiles = (-(-self.rows // self.tile), -(-self.cols // self.tile))
+        self.folder = tempfile.mkdtemp(prefix="field") if folder is None else folder
+        os.makedirs(self.folder, exist_ok=True)
+        # The finalizer must not hold a reference to the map
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.folder, True) if folder is None else None
+        shape = self.tiles + (self.tile, self.tile)
+        self._layers = {}
+        for name, dtype in _DTYPES.items():
+            path = os.path.join(self.folder, f"{name}.dat")
+            self._layers[name] = np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+        self.version = np.zeros(self.tiles, dtype=np.int64)
+        # Distance transform state
+        self.maximum_distance = 0.0
+        self._distanceVersion = np.full(self.tiles, -1, dtype=np.int64)
+
+    @classmethod
+    def fromArray(cls, occupancy, xmin, xmax, ymin, ymax, grass=None, **kwargs):
+        occupancy = np.asarray(occupancy)
+        rows, cols = occupancy.shape
+        resolution = (xmax - xmin) / cols
+        if not math.isclose((ymax - ymin) / rows, resolution, rel_tol=1e-6):
+            raise ValueError("Array cells must be square over the given bounds.")
+        field = cls(xmin, xmax, ymin, ymax, resolution, **kwargs)
+        field.write(OCCUPANCY, 0, 0, occupancy != 0)
+        if grass is not None:
+            field.write(GRASS, 0, 0, grass)
+        return field
+
+    @classmethod
+    def fromImage(cls, filename, xmin, xmax, ymin, ymax, threshold=0.5, **kwargs):
+        # Dark pixels are obstacles; image rows run from the top of the field down
+        import matplotlib.pyplot as plt
+        image = np.asarray(plt.imread(filename), dtype=float)
+        if image.ndim == 3:
+            image = image[..., :3].mean(axis=2)
+        if image.max() > 1.0:
+            image /= 255.0
+        return cls.fromArray(np.flipud(image < threshold), xmin, xmax, ymin, ymax, **kwargs)
+
+    def layer(self, name):
+        return self._layers[name]
+
+    def flush(self):
+        for data in self._layers.values():
+            data.flush()
+
+    def close(self):
+        # Memmaps must be released before their files can be removed
+        if self._layers:
+            self.flush()
+            self._layers = {}
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    ##########################################################################################
+    # Cells
+
+    def index(self, x, y):
+        col = np.floor((np.asarray(x, dtype=float) - self.xmin) / self.resolution).astype(np.int64)
+        row = np.floor((np.asarray(y, dtype=float) - self.ymin) / self.resolution).astype(np.int64)
+        return row, col
+
+    def center(self, row, col):
+        return (self.xmin + (np.asarray(col) + 0.5) * self.resolution,
+                self.ymin + (np.asarray(row) + 0.5) * self.resolution)
+
+    def inside(self, row, col):
+        return (row >= 0) & (row < self.rows) & (col >= 0) & (col < self.cols)
+
+    def lookup(self, name, row, col, outside=0):
+        row, col = np.broadcast_arrays(np.asarray(row), np.asarray(col))
+        inside = self.inside(row, col)
+        r = np.where(inside, row, 0)
+        c = np.where(inside, col, 0)
+        T = self.tile
+        value = self._layers[name][r // T, c // T, r % T, c % T]
+        return np.where(inside, value, outside)
+
+    def occupied(self, x, y):
+        return self.lookup(OCCUPANCY, *self.index(x, y), outside=1).astype(bool)
+
+    def grass(self, x, y):
+        return self.lookup(GRASS, *self.index(x, y))
+
+    def distance(self, x, y):
+        return self.lookup(DISTANCE, *self.index(x, y), outside=0.0)
+
+    def inflated(self, x, y, radius):
+        # Occupied or closer than radius to an obstacle (distances are capped at the maximum)
+        return self.occupied(x, y) | (self.distance(x, y) < radius)
+
+    ##########################################################################################
+    # Blocks
+
+    def read(self, name, r0, r1, c0, c1, fill=0):
+        """
+        Assemble the cell block [r0:r1, c0:c1] from the tiles, padding outside the field.
+        """
+        data = self._layers[name]
+        block = np.full((r1 - r0, c1 - c0), fill, dtype=data.dtype)
+        T = self.tile
+        for tr in range(max(r0, 0) // T, (min(r1, self.rows) - 1) // T + 1):
+            for tc in range(max(c0, 0) // T, (min(c1, self.cols) - 1) // T + 1):
+                a0, a1 = max(r0, tr * T), min(r1, (tr + 1) * T, self.rows)
+                b0, b1 = max(c0, tc * T), min(c1, (tc + 1) * T, self.cols)
+                if a0 < a1 and b0 < b1:
+                    block[a0 - r0:a1 - r0, b0 - c0:b1 - c0] = data[tr, tc, a0 - tr * T:a1 - tr * T, b0 - tc * T:b1 - tc * T]
+        return block
+
+    def write(self, name, r0, c0, block):
+        block = np.asarray(block)
+        data = self._layers[name]
+        T = self.tile
+        r1 = min(r0 + block.shape[0], self.rows)
+        c1 = min(c0 + block.shape[1], self.cols)
+        r0, c0 = max(r0, 0), max(c0, 0)
+        for tr in range(r0 // T, (r1 - 1) // T + 1):
+            for tc in range(c0 // T, (c1 - 1) // T + 1):
+                a0, a1 = max(r0, tr * T), min(r1, (tr + 1) * T)
+                b0, b1 = max(c0, tc * T), min(c1, (tc + 1) * T)
+                if a0 < a1 and b0 < b1:
+                    data[tr, tc, a0 - tr * T:a1 - tr * T, b0 - tc * T:b1 - tc * T] = block[a0 - r0:a1 - r0, b0 - c0:b1 - c0]
+                    self.version[tr, tc] += 1
+
+    def rasterize(self, shape, value=1, name=OCCUPANCY):
+        """
+        Burn a filled Shape (Rectangle, Circle, Polygon) into a layer.
+        """
+        from matplotlib.path import Path
+        vertices = shape.vertices()
+        (r0, c0), (r1, c1) = (np.array(self.index(*vertices.min(axis=0))),
+                              np.array(self.index(*vertices.max(axis=0))) + 1)
+        r0, c0 = max(r0, 0), max(c0, 0)
+        r1, c1 = min(r1, self.rows), min(c1, self.cols)
+        if r0 >= r1 or c0 >= c1:
+            return
+        rows, cols = np.mgrid[r0:r1, c0:c1]
+        x, y = self.center(rows, cols)
+        inside = Path(vertices).contains_points(np.column_stack((x.ravel(), y.ravel()))).reshape(x.shape)
+        block = self.read(name, r0, r1, c0, c1)
+        block[inside] = value
+        self.write(name, r0, c0, block)
+
+    ##########################################################################################
+    # Obstacle inflation
+
+    def updateDistance(self, maximum=1.0):
+        """
+        Distance to the nearest obstacle, capped at maximum (m), for every tile that changed
+        since the last update (and the neighbours within reach). Each tile is processed with a
+        halo of the cap, so memory stays proportional to a single tile.
+        """
+        if maximum != self.maximum_distance:
+            self.maximum_distance = maximum
+            self._distanceVersion[:] = -1
+        R = int(math.ceil(maximum / self.resolution))
+        reach = -(-R // self.tile)
+        changed = self.version != self._distanceVersion
+        if not changed.any():
+            return
+        # Dilate the changed tiles by the reach of the cap
+        stale = np.zeros_like(changed)
+        for tr, tc in np.argwhere(changed):
+            stale[max(tr - reach, 0):tr + reach + 1, max(tc - reach, 0):tc + reach + 1] = True
+        T = self.tile
+        out = self._layers[DISTANCE]
+        for tr, tc in np.argwhere(stale):
+            r0, c0 = tr * T, tc * T
+            block = self.read(OCCUPANCY, r0 - R, r0 + T + R, c0 - R, c0 + T + R) != 0
+            d = _distance_transform(block, R)[R:R + T, R:R + T]
+            out[tr, tc] = np.minimum(d * self.resolution, maximum)
+        self._distanceVersion[:] = self.version
+
+##############################################################################################
+
+def _distance_transform(obstacles, R):
+    """
+    Euclidean distance (in cells) to the nearest True cell, exact up to R and capped at R + 1.
+    Exact 1-D distances along the columns, then a bounded lower envelope along the rows.
+    """
+    h, w = obstacles.shape
+    big = R + 1
+    idx = np.arange(h)[:, None]
+    last = np.maximum.accumulate(np.where(obstacles, idx, -2 * h), axis=0)
+    nxt = np.minimum.accumulate(np.where(obstacles, idx, 3 * h)[::-1], axis=0)[::-1]
+    g = np.minimum(np.minimum(idx - last, nxt - idx), big).astype(np.float64)
+    g2 = g * g
+    d2 = g2.copy()
+    for k in range(1, min(R, w - 1) + 1):
+        k2 = float(k * k)
+        np.minimum(d2[:, k:], g2[:, :-k] + k2, out=d2[:, k:])
+        np.minimum(d2[:, :-k], g2[:, k:] + k2, out=d2[:, :-k])
+    return np.minimum(np.sqrt(d2), big)
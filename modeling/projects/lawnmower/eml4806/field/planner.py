@@ -0,0 +1,286 @@
+import math
+import heapq
+from array import array
+import numpy as np
+
+from eml4806.field.map import OCCUPANCY, DISTANCE
+from eml4806.geometry.vector import Points2D
+
+##############################################################################################
+
+# 8-connected moves (row, col, cost in cells)
+_SQRT2 = math.sqrt(2.0)
+_MOVES = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+          (1, 1, _SQRT2), (1, -1, _SQRT2), (-1, 1, _SQRT2), (-1, -1, _SQRT2))
+
+def octile(dr, dc):
+    dr, dc = abs(dr), abs(dc)
+    return max(dr, dc) + (_SQRT2 - 1.0) * min(dr, dc)
+
+##############################################################################################
+
+class GridPlanner:
+    """
+    A* and Dijkstra planning on the occupancy grid of a FieldMap.
+
+    Cells closer than radius to an obstacle (the inflated map, see FieldMap.updateDistance) are
+    blocked, as is everything outside the field. The free mask is built per map tile, when a
+    search first reaches the tile, and rebuilt only for tiles whose cells (or obstacles within
+    the radius) changed, so the grid is never loaded whole. Likewise the open and closed sets of
+    a search are typed arrays (cost, parent, closed flag) per map tile, allocated when the search
+    first reaches the tile, with a binary heap as the priority queue. Diagonal moves may not cut
+    blocked corners. Paths are returned as (K, 2) world coordinates, optionally shortened by
+    line-of-sight smoothing.
+
+    Cost-to-go fields to a goal (e.g. the dock) are cached, so repeated queries towards the same
+    goal only follow the descent pointers from the start, in O(path length). Smoothing a path
+    costs more, so smoothed return-to-home paths are cached per start cell as well.
+    """
+
+    def __init__(self, field, radius=0.0, homes=1024):
+        self.field = field
+        self.radius = float(radius)
+        self.homes = int(homes)  # Cached smoothed home paths
+        self._version = None
+        self._tiles = {}    # (tile row, tile col): bytes, 1 for free cells
+        self._fields = {}   # goal cell: search blocks of its cost-to-go field
+        self._homes = {}    # (goal cell, start cell, smooth): cells of the home path
+        self.refresh()
+
+    def refresh(self):
+        # Drop the free masks of the tiles the map changed around
+        f = self.field
+        if self._version is not None and np.array_equal(self._version, f.version):
+            return
+        if self.radius > 0.0:
+            f.updateDistance(max(f.maximum_distance, self.radius))
+        if self._version is None:
+            self._tiles.clear()
+        else:
+            reach = -(-int(math.ceil(self.radius / f.resolution)) // f.tile)
+            for tr, tc in np.argwhere(f.version != self._version):
+                for key in [k for k in self._tiles if abs(k[0] - tr) <= reach and abs(k[1] - tc) <= reach]:
+                    del self._tiles[key]
+        self._fields = {}
+        self._homes = {}
+        self._version = f.version.copy()
+
+    def blocked(self, row, col):
+        """
+        Blocked cells, vectorized over row and col. Reads only the cells asked for.
+        """
+        f = self.field
+        blocked = f.lookup(OCCUPANCY, row, col, outside=1) != 0
+        if self.radius > 0.0:
+            blocked |= f.lookup(DISTANCE, row, col, outside=0.0) < self.radius
+        return blocked
+
+    def _tile(self, tr, tc):
+        mask = self._tiles.get((tr, tc))
+        if mask is None:
+            T = self.field.tile
+            rows, cols = np.mgrid[tr * T:(tr + 1) * T, tc * T:(tc + 1) * T]
+            mask = self._tiles[tr, tc] = (~self.blocked(rows, cols)).astype(np.int8).tobytes()
+        return mask
+
+    def _search(self, s, g=None):
+        # A* from s to g, or Dijkstra from s over every reachable cell without g. Returns the
+        # search blocks {(tile row, tile col): (free mask, cost in cells, parent, closed)},
+        # indexed by the cell offset in the tile
+        f = self.field
+        rows, cols, T = f.rows, f.cols, f.tile
+        size = T * T
+        tiles = self._tiles
+        tile = self._tile
+        blocks = {}
+        costs = array("d", [math.inf]) * size
+        parents = array("q", [-1]) * size
+        moves = [(dr, dc, step, dr * T + dc) for dr, dc, step in _MOVES]
+
+        def block(key):
+            b = blocks[key] = (tiles.get(key) or tile(*key), costs[:], parents[:], bytearray(size))
+            return b
+
+        def free(r, c):
+            mask = tiles.get((r // T, c // T)) or tile(r // T, c // T)
+            return mask[(r % T) * T + c % T]
+
+        sr, sc = divmod(s, cols)
+        b = block((sr // T, sc // T))
+        b[1][(sr % T) * T + sc % T] = 0.0
+        b[2][(sr % T) * T + sc % T] = s
+        if g is None:
+            gr = gc = None
+        else:
+            gr, gc = divmod(g, cols)
+        heap = [(0.0 if g is None else octile(sr - gr, sc - gc), s)]
+        while heap:
+            _, u = heapq.heappop(heap)
+            ur, uc = divmod(u, cols)
+            bu = blocks[ur // T, uc // T]
+            ju = (ur % T) * T + uc % T
+            if bu[3][ju]:
+                continue
+            bu[3][ju] = 1
+            if u == g:
+                break
+            cu = bu[1][ju]
+            if 0 < ur % T < T - 1 and 0 < uc % T < T - 1:
+                # Inside the tile every neighbour is in the same block (cells past the field
+                # edge are blocked in the mask)
+                mask, cost, parent, closed = bu
+                for dr, dc, step, dj in moves:
+                    jv = ju + dj
+                    if closed[jv] or not mask[jv]:
+                        continue
+                    if dr and dc and not (mask[ju + dc] and mask[ju + dr * T]):
+                        continue
+                    cv = cu + step
+                    if cv < cost[jv]:
+                        cost[jv] = cv
+                        parent[jv] = u
+                        v = u + dr * cols + dc
+                        heapq.heappush(heap, (cv if g is None else cv + octile(ur + dr - gr, uc + dc - gc), v))
+                continue
+            for dr, dc, step in _MOVES:
+                r, c = ur + dr, uc + dc
+                if r < 0 or r >= rows or c < 0 or c >= cols:
+                    continue
+                key = (r // T, c // T)
+                bv = blocks.get(key) or block(key)
+                jv = (r % T) * T + c % T
+                if bv[3][jv] or not bv[0][jv]:
+                    continue
+                if dr and dc and not (free(ur, c) and free(r, uc)):
+                    continue
+                cv = cu + step
+                if cv < bv[1][jv]:
+                    bv[1][jv] = cv
+                    bv[2][jv] = u
+                    heapq.heappush(heap, (cv if g is None else cv + octile(r - gr, c - gc), r * cols + c))
+        return blocks
+
+    def _parent(self, blocks, v):
+        # Parent of flat cell v in the search blocks, -1 when the search never reached it
+        T, cols = self.field.tile, self.field.cols
+        r, c = divmod(v, cols)
+        b = blocks.get((r // T, c // T))
+        return -1 if b is None else b[2][(r % T) * T + c % T]
+
+    def _descend(self, blocks, s, g):
+        # Cells from s to g following the parent pointers
+        cells = [s]
+        while cells[-1] != g:
+            cells.append(self._parent(blocks, cells[-1]))
+        return cells
+
+    ##########################################################################################
+
+    def plan(self, start, goal, smooth=True):
+        """
+        A* from start to goal (world coordinates). Returns a (K, 2) path or None.
+        """
+        self.refresh()
+        s, g = self._cell(start), self._cell(goal)
+        if s is None or g is None:
+            return None
+        blocks = self._search(s, g)
+        if self._parent(blocks, g) < 0:
+            return None
+        cells = self._descend(blocks, g, s)[::-1]
+        return self._path(self._smooth(cells) if smooth else cells, start, goal)
+
+    def costToGo(self, goal):
+        """
+        Dijkstra cost-to-go field (m) to goal, cached per goal cell. Returns the (rows, cols)
+        cost array (inf where the goal cannot be reached) and the flat index of the next cell
+        towards the goal (-1 where it cannot be reached). Only the tiles the search reached are
+        kept between calls.
+        """
+        blocks = self._costToGo(goal)
+        f = self.field
+        T = f.tile
+        cost = np.full((f.rows, f.cols), np.inf)
+        nxt = np.full((f.rows, f.cols), -1, dtype=np.int64)
+        for (tr, tc), b in blocks.items():
+            r0, c0 = tr * T, tc * T
+            h, w = min(T, f.rows - r0), min(T, f.cols - c0)
+            cost[r0:r0 + h, c0:c0 + w] = np.frombuffer(b[1], dtype=np.float64).reshape(T, T)[:h, :w]
+            nxt[r0:r0 + h, c0:c0 + w] = np.frombuffer(b[2], dtype=np.int64).reshape(T, T)[:h, :w]
+        return cost * f.resolution, nxt
+
+    def _costToGo(self, goal):
+        self.refresh()
+        g = self._cell(goal)
+        if g is None:
+            raise ValueError("Goal is outside the free space.")
+        blocks = self._fields.get(g)
+        if blocks is None:
+            blocks = self._fields[g] = self._search(g)
+        return blocks
+
+    def home(self, start, dock, smooth=True):
+        """
+        Path from start to the dock using its cached cost-to-go field. Returns (K, 2) or None.
+        """
+        blocks = self._costToGo(dock)
+        s, g = self._cell(start), self._cell(dock)
+        if s is None or self._parent(blocks, s) < 0:
+            return None
+        key = (g, s, smooth)
+        cells = self._homes.get(key)
+        if cells is None:
+            cells = self._descend(blocks, s, g)
+            if smooth:
+                cells = self._smooth(cells)
+            if len(self._homes) >= self.homes:
+                del self._homes[next(iter(self._homes))]  # Oldest first
+            self._homes[key] = cells
+        return self._path(cells, start, dock)
+
+    ##########################################################################################
+
+    def _cell(self, point):
+        row, col = self.field.index(*point)
+        row, col = int(row), int(col)
+        if self.blocked(row, col):
+            return None
+        return row * self.field.cols + col
+
+    def _smooth(self, cells):
+        rows, cols = np.divmod(np.asarray(cells, dtype=np.int64), self.field.cols)
+        return [cells[k] for k in self._shortcut(rows, cols)]
+
+    def _path(self, cells, start, goal):
+        rows, cols = np.divmod(np.asarray(cells, dtype=np.int64), self.field.cols)
+        x, y = self.field.center(rows, cols)
+        path = np.column_stack((x, y))
+        path[0] = start
+        path[-1] = goal
+        return Points2D.wrap(path)
+
+    def _shortcut(self, rows, cols):
+        # Greedy line-of-sight smoothing over the cell path
+        keep = [0]
+        i, n = 0, len(rows)
+        while i < n - 1:
+            j = n - 1
+            while j > i + 1 and not self._visible(rows[i], cols[i], rows[j], cols[j]):
+                j -= 1
+            keep.append(j)
+            i = j
+        return np.asarray(keep)
+
+    def _visible(self, r0, c0, r1, c1):
+        # Sample the segment at a quarter of a cell, including the cells the footprint sweeps
+        steps = int(4 * max(abs(r1 - r0), abs(c1 - c0))) + 1
+        t = np.linspace(0.0, 1.0, steps + 1)
+        r = r0 + 0.5 + t * (r1 - r0)
+        c = c0 + 0.5 + t * (c1 - c0)
+        cells = [(np.floor(r).astype(np.int64), np.floor(c).astype(np.int64))]
+        for dr, dc in ((0.25, 0.25), (0.25, -0.25), (-0.25, 0.25), (-0.25, -0.25)):
+            cells.append((np.floor(r + dr).astype(np.int64), np.floor(c + dc).astype(np.int64)))
+        for rr, cc in cells:
+            if self.blocked(rr, cc).any():
+                return False
+        return True
@@ -0,0 +1,299 @@
+import numpy as np
+
+##############################################################################################
+
+# Collision detection between robots (oriented boxes) and static obstacles.
+#
+# Broad phase: a uniform grid (spatial hash) at least as large as any robot footprint, so two
+# robots can only touch if their centers fall in the same or adjacent cells. Robot cell keys are
+# re-sorted every tick starting from the previous order, which is almost sorted already, and
+# grouped into runs of equal cells. Obstacles are static and registered once in every cell their
+# bounding box covers, dilated by one cell, so each robot only looks up its own cell.
+#
+# Narrow phase: separating-axis tests, vectorized over all candidate pairs. Robot axes are
+# computed once per tick in update(); obstacle axes, hull edge normals and the projections of
+# the hulls on them are computed once when the obstacle is added.
+
+_K = np.int64(1 << 21)   # Key stride between grid columns
+_O = np.int64(1 << 20)   # Offset keeping cell indices positive
+
+def footprint(chassis):
+    """
+    Half extents (along, across) of the rectangular chassis footprint.
+    """
+    return 0.5 * chassis.length, 0.5 * chassis.width
+
+def convex_hull(points):
+    """
+    Convex hull of an (N, 2) point set (monotone chain), counter-clockwise.
+    """
+    p = np.unique(np.asarray(points, dtype=float).reshape(-1, 2), axis=0)
+    if len(p) < 3:
+        return p
+    def chain(pts):
+        h = []
+        for q in pts:
+            while len(h) >= 2 and _cross(h[-1] - h[-2], q - h[-2]) <= 0:
+                h.pop()
+            h.append(q)
+        return h[:-1]
+    return np.array(chain(p) + chain(p[::-1]))
+
+##############################################################################################
+
+class CollisionWorld:
+    """
+    Robot-robot and robot-obstacle collision checks.
+
+    Obstacles are Rectangle, Circle or Polygon shapes from eml4806.graphics.shape (polygons are
+    checked as their convex hull). Robots are given each tick as centers (N, 2), headings (N,)
+    and footprint half extents (N, 2) or (2,), e.g. from a RobotFleet.
+    """
+
+    def __init__(self, cell=1.0):
+        self.cell = float(cell)
+        # Obstacles
+        self._kinds = []       # per obstacle: (kind, index)
+        self._boxes = []       # (cx, cy, cos, sin, hx, hy)
+        self._circles = []     # (cx, cy, r)
+        self._polygons = []    # convex hulls
+        self._hulls = np.zeros((0, 0, 2))      # hulls padded to a common vertex count
+        self._normals = np.zeros((0, 0, 2))    # edge normals of the padded hulls
+        self._extents = np.zeros((0, 0, 2))    # (min, max) of each hull along its normals
+        self._bounds = []      # world AABB per obstacle
+        self._obstacleKeys = np.zeros(0, dtype=np.int64)
+        self._obstacleIds = np.zeros(0, dtype=np.int64)
+        # Robots
+        self._order = np.zeros(0, dtype=np.int64)
+        self._sorted = np.zeros(0, dtype=np.int64)
+        self._cellRuns = _runs(self._sorted)
+        self._center = np.zeros((0, 2))
+        self._axes = np.zeros((0, 2))  # (cos, sin) of the headings
+        self._half = np.zeros((0, 2))
+
+    ##########################################################################################
+    # Obstacles
+
+    def addObstacle(self, shape):
+        from eml4806.graphics.shape import Rectangle, Circle, Polygon
+        T = shape.worldTransform()
+        sx, sy = T.scaling
+        if isinstance(shape, Rectangle):
+            a = T.orientation
+            box = (T.position[0], T.position[1], np.cos(a), np.sin(a), 0.5 * shape.w * sx, 0.5 * shape.h * sy)
+            self._kinds.append(("box", len(self._boxes)))
+            self._boxes.append(box)
+            corners = _corners(np.array([box[:2]]), np.array([box[2:4]]), np.array([box[4:]]))[0]
+            bounds = (*corners.min(axis=0), *corners.max(axis=0))
+        elif isinstance(shape, Circle):
+            r = shape.r * max(sx, sy)
+            x, y = T.position
+            self._kinds.append(("circle", len(self._circles)))
+            self._circles.append((x, y, r))
+            bounds = (x - r, y - r, x + r, y + r)
+        elif isinstance(shape, Polygon):
+            hull = convex_hull(shape.vertices())
+            self._kinds.append(("polygon", len(self._polygons)))
+            self._polygons.append(hull)
+            self._padHulls()
+            bounds = (*hull.min(axis=0), *hull.max(axis=0))
+        else:
+            raise ValueError(f"Unsupported obstacle shape {type(shape).__name__}.")
+        self._bounds.append(bounds)
+        self._register()
+        return len(self._kinds) - 1
+
+    def _padHulls(self):
+        # Repeating the last vertex adds zero-length edges, whose null normals never separate
+        m = max(len(hull) for hull in self._polygons)
+        hulls = np.array([np.concatenate((hull, np.repeat(hull[-1:], m - len(hull), axis=0)))
+                          for hull in self._polygons])
+        edges = np.roll(hulls, -1, axis=1) - hulls
+        normals = np.stack((edges[..., 1], -edges[..., 0]), axis=-1)
+        proj = np.einsum("pmk,pek->pme", hulls, normals)   # vertex m on normal e
+        self._hulls = hulls
+        self._normals = normals
+        self._extents = np.stack((proj.min(axis=1), proj.max(axis=1)), axis=-1)
+
+    def _register(self):
+        # Static cell table, sorted by key
+        keys, ids = [], []
+        for id, (x0, y0, x1, y1) in enumerate(self._bounds):
+            ix = np.arange(np.floor(x0 / self.cell) - 1, np.floor(x1 / self.cell) + 2).astype(np.int64)
+            iy = np.arange(np.floor(y0 / self.cell) - 1, np.floor(y1 / self.cell) + 2).astype(np.int64)
+            k = ((ix[:, None] + _O) * _K + (iy[None, :] + _O)).ravel()
+            keys.append(k)
+            ids.append(np.full(len(k), id, dtype=np.int64))
+        keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+        ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        self._obstacleKeys = keys[order]
+        self._obstacleIds = ids[order]
+        self._obstacleCells, self._obstacleStart, self._obstacleCount = _runs(self._obstacleKeys)
+        self._boxArray = np.array(self._boxes, dtype=float).reshape(-1, 6)
+        self._circleArray = np.array(self._circles, dtype=float).reshape(-1, 3)
+        self._kindArray = np.array([{"box": 0, "circle": 1, "polygon": 2}[k] for k, _ in self._kinds], dtype=np.int8)
+        self._indexArray = np.array([i for _, i in self._kinds], dtype=np.int64)
+
+    ##########################################################################################
+    # Robots
+
+    def update(self, centers, angles, half):
+        c = np.asarray(centers, dtype=float).reshape(-1, 2)
+        n = len(c)
+        a = np.broadcast_to(np.asarray(angles, dtype=float), (n,))
+        h = np.broadcast_to(np.asarray(half, dtype=float), (n, 2))
+        # The grid must be at least as large as any footprint
+        extent = 2.0 * np.sqrt((h * h).sum(axis=1)).max() if n else 0.0
+        if extent > self.cell:
+            self.cell = extent
+            self._register()
+        self._center, self._half = c, h
+        self._axes = np.column_stack((np.cos(a), np.sin(a)))
+        keys = self._cells(c)
+        # Incremental re-sort from the previous order
+        if len(self._order) != n:
+            self._order = np.arange(n, dtype=np.int64)
+        o = np.argsort(keys[self._order], kind="stable")
+        self._order = self._order[o]
+        self._sorted = keys[self._order]
+        self._cellRuns = _runs(self._sorted)
+
+    def robotPairs(self):
+        """
+        Colliding robot index pairs (K, 2) with i < j.
+        """
+        order, ordered = self._order, self._sorted
+        n = len(ordered)
+        # Own cell plus half of the neighbourhood, so every cell pair is visited once.
+        # Queries are issued in cell order, which keeps the binary search cache friendly.
+        offsets = np.array([0, _K - 1, _K, _K + 1, 1], dtype=np.int64)
+        queries = (ordered[None, :] + offsets[:, None]).ravel()
+        q, j = _expand(*self._cellRuns, order, queries)
+        i = order[q % n] if n else q
+        # Within the own cell keep each pair once
+        keep = (q >= n) | (i < j)
+        pairs = np.column_stack((i[keep], j[keep]))
+        if len(pairs) == 0:
+            return pairs
+        i, j = pairs[:, 0], pairs[:, 1]
+        hit = _boxes_overlap(self._center[i], self._axes[i], self._half[i],
+                             self._center[j], self._axes[j], self._half[j])
+        return np.sort(pairs[hit], axis=1)
+
+    def obstacleHits(self):
+        """
+        Colliding (robot, obstacle) index pairs (K, 2).
+        """
+        if len(self._sorted) == 0 or len(self._obstacleKeys) == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+        q, k = _expand(self._obstacleCells, self._obstacleStart, self._obstacleCount, self._obstacleIds, self._sorted)
+        i = self._order[q]
+        pairs = np.column_stack((i, k))
+        if len(pairs) == 0:
+            return pairs
+        kind = self._kindArray[k]
+        index = self._indexArray[k]
+        center, axes, half = self._center[i], self._axes[i], self._half[i]
+        hit = np.zeros(len(pairs), dtype=bool)
+        # Boxes
+        m = kind == 0
+        if m.any():
+            b = self._boxArray[index[m]]
+            hit[m] = _boxes_overlap(center[m], axes[m], half[m], b[:, :2], b[:, 2:4], b[:, 4:])
+        # Circles
+        m = kind == 1
+        if m.any():
+            c = self._circleArray[index[m]]
+            hit[m] = _box_circle_overlap(center[m], axes[m], half[m], c[:, :2], c[:, 2])
+        # Polygons
+        m = kind == 2
+        if m.any():
+            p = index[m]
+            hit[m] = _box_polygon_overlap(center[m], axes[m], half[m], self._hulls[p], self._normals[p], self._extents[p])
+        pairs = pairs[hit]
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def _cells(self, centers):
+        ix = np.floor(centers[:, 0] / self.cell).astype(np.int64)
+        iy = np.floor(centers[:, 1] / self.cell).astype(np.int64)
+        return (ix + _O) * _K + (iy + _O)
+
+##############################################################################################
+
+def _runs(ordered):
+    # Distinct cells of a sorted key array with the start and length of their runs
+    if len(ordered) == 0:
+        return ordered, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    start = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))
+    count = np.diff(np.append(start, len(ordered)))
+    return ordered[start], start, count
+
+def _expand(cells, start, count, values, queries):
+    # Every (query index, value) pair whose cell equals the query cell
+    if len(cells) == 0:
+        return np.zeros(0, dtype=np.int64), values[:0]
+    k = np.minimum(np.searchsorted(cells, queries), len(cells) - 1)
+    n = np.where(cells[k] == queries, count[k], 0)
+    q = np.repeat(np.arange(len(queries), dtype=np.int64), n)
+    first = np.repeat(start[k] - (np.cumsum(n) - n), n)
+    return q, values[first + np.arange(len(q))]
+
+def _cross(a, b):
+    return a[0] * b[1] - a[1] * b[0]
+
+def _axes(axes):
+    # Box axes u, v from the (cos, sin) of the heading
+    c, s = axes[:, 0], axes[:, 1]
+    return axes, np.column_stack((-s, c))
+
+def _corners(center, axes, half):
+    u, v = _axes(axes)
+    hu = u * half[:, :1]
+    hv = v * half[:, 1:]
+    return np.stack((center - hu - hv, center + hu - hv, center + hu + hv, center - hu + hv), axis=1)
+
+def _dot(a, b):
+    return a[:, 0] * b[:, 0] + a[:, 1] * b[:, 1]
+
+def _boxes_overlap(c1, u1, h1, c2, u2, h2):
+    # Separating axes of both boxes, with the second box expressed relative to the first
+    c1x, s1 = u1[:, 0], u1[:, 1]
+    c2x, s2 = u2[:, 0], u2[:, 1]
+    dx, dy = c2[:, 0] - c1[:, 0], c2[:, 1] - c1[:, 1]
+    d1x = np.abs(c1x * dx + s1 * dy)
+    d1y = np.abs(c1x * dy - s1 * dx)
+    d2x = np.abs(c2x * dx + s2 * dy)
+    d2y = np.abs(c2x * dy - s2 * dx)
+    # cos and sin of the relative rotation
+    c = np.abs(c1x * c2x + s1 * s2)
+    s = np.abs(c1x * s2 - s1 * c2x)
+    ax, ay, bx, by = h1[:, 0], h1[:, 1], h2[:, 0], h2[:, 1]
+    return ((d1x <= ax + bx * c + by * s) & (d1y <= ay + bx * s + by * c) &
+            (d2x <= bx + ax * c + ay * s) & (d2y <= by + ax * s + ay * c))
+
+def _box_circle_overlap(c, axes, h, center, r):
+    u, v = _axes(axes)
+    d = center - c
+    # Closest point of the box to the circle center, in box coordinates
+    x = np.clip(_dot(d, u), -h[:, 0], h[:, 0])
+    y = np.clip(_dot(d, v), -h[:, 1], h[:, 1])
+    ex = _dot(d, u) - x
+    ey = _dot(d, v) - y
+    return ex * ex + ey * ey <= r * r
+
+def _box_polygon_overlap(c, axes, h, hulls, normals, extents):
+    # Box i against padded hull i (N, M, 2), with its edge normals and their extents (N, M, 2)
+    u, v = _axes(axes)
+    separated = np.zeros(len(c), dtype=bool)
+    # Box axes
+    for axis in (u, v):
+        proj = np.einsum("nmk,nk->nm", hulls, axis)
+        center = _dot(c, axis)
+        r = h[:, 0] * np.abs(_dot(u, axis)) + h[:, 1] * np.abs(_dot(v, axis))
+        separated |= (proj.max(axis=1) < center - r) | (proj.min(axis=1) > center + r)
+    # Polygon edge normals
+    center = np.einsum("nk,nek->ne", c, normals)
+    r = h[:, :1] * np.abs(np.einsum("nk,nek->ne", u, normals)) + h[:, 1:] * np.abs(np.einsum("nk,nek->ne", v, normals))
+    separated |= ((extents[..., 1] < center - r) | (extents[..., 0] > center + r)).any(axis=1)
+    return ~separated
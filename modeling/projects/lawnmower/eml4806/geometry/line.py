@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 def point_to_line_distance(x, y, x1, y1, x2, y2):
     """
@@ -45,4 +46,41 @@ def closest_point_on_line(xp, yp, x1, y1, x2, y2):
     cx = x1 + t * dx
     cy = y1 + t * dy
 
-    return cx, cy
\ No newline at end of file
+    return cx, cy
+
+def closest_points_on_segment(points, p1, p2):
+    """
+    Returns the closest points on the segment from p1 to p2 to each row
+    of an (N, 2) array of points. Vectorized over the rows.
+    """
+    p = np.asarray(points, dtype=float).reshape(-1, 2)
+    a = np.asarray(p1, dtype=float)
+    d = np.asarray(p2, dtype=float) - a
+
+    # Degenerate segment
+    d_sq = d @ d
+    if d_sq == 0:
+        return np.broadcast_to(a, p.shape).copy()
+
+    # Projection factor of every point, clamped to the segment
+    t = np.clip(((p - a) @ d) / d_sq, 0.0, 1.0)
+    return a + t[:, None] * d
+
+
+def closest_point_on_polyline(point, path):
+    """
+    Returns the closest point on a (K, 2) polyline to a point and
+    the index of the segment it lies on.
+    """
+    p = np.asarray(point, dtype=float).reshape(2)
+    a = np.asarray(path, dtype=float).reshape(-1, 2)
+    if len(a) == 1:
+        return a[0].copy(), 0
+    b = a[1:]
+    a = a[:-1]
+    d = b - a
+    d_sq = np.einsum("ij,ij->i", d, d)
+    t = np.clip(np.einsum("ij,ij->i", p - a, d) / np.where(d_sq > 0, d_sq, 1.0), 0.0, 1.0)
+    q = a + t[:, None] * d
+    k = int(np.argmin(np.einsum("ij,ij->i", q - p, q - p)))
+    return q[k], k
@@ -0,0 +1,140 @@
+import numpy as np
+
+from eml4806.geometry.vector import ensure
+
+##############################################################################################
+
+def douglas_peucker(points, tol):
+    """
+    Simplify an (N, 2) polyline so that no removed vertex is farther than tol
+    from the simplified one. Endpoints are always kept.
+    """
+    p = ensure(points)
+    n = len(p)
+    if n < 3 or tol <= 0.0:
+        return p.copy()
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        a = p[i]
+        d = p[j] - a
+        q = p[i + 1:j] - a
+        l = np.hypot(d[0], d[1])
+        if l > 0.0:
+            # Perpendicular distance to the chord
+            dist = np.abs(d[0] * q[:, 1] - d[1] * q[:, 0]) / l
+        else:
+            # Closed loop, distance to the anchor
+            dist = np.hypot(q[:, 0], q[:, 1])
+        k = int(np.argmax(dist))
+        if dist[k] > tol:
+            k += i + 1
+            keep[k] = True
+            stack.append((i, k))
+            stack.append((k, j))
+    return p[keep]
+
+##############################################################################################
+
+class Simplifier:
+    """
+    Online polyline simplification (sleeve/cone pruning).
+
+    Each appended point either extends the current segment, when every point dropped since the
+    segment anchor stays within tol of it, or starts a new segment. The cost is O(1) per point,
+    so collinear runs collapse into a single segment no matter how long they are.
+    A non-positive tolerance keeps every point.
+    """
+
+    def __init__(self, tolerance=0.0, points=None):
+        self.tolerance = float(tolerance)
+        self._data = np.zeros((64, 2), dtype=float)
+        self._size = 0
+        self.reset(points)
+
+    def __len__(self):
+        return self._size
+
+    def points(self):
+        return self._data[:self._size]
+
+    def last(self):
+        return self._data[self._size - 1]
+
+    def reset(self, points=None):
+        p = douglas_peucker(points, self.tolerance)
+        self._size = 0
+        self._reserve(len(p))
+        self._data[:len(p)] = p
+        self._size = len(p)
+        # The last vertex is committed, the next point starts a new segment
+        self._open = False
+
+    def append(self, point):
+        p = np.asarray(point, dtype=float).reshape(2)
+        tol = self.tolerance
+        if tol <= 0.0 or self._size == 0:
+            self._push(p)
+            return
+        if self._open:
+            anchor = self._data[self._size - 2]
+            dx, dy = p[0] - anchor[0], p[1] - anchor[1]
+            dist = np.hypot(dx, dy)
+            # Close to the anchor vertex
+            if dist <= tol:
+                return
+            phi = self._angle(dx, dy)
+            if self._lo <= phi <= self._hi:
+                half = np.arcsin(min(1.0, tol / dist))
+                lo = max(self._lo, phi - half)
+                hi = min(self._hi, phi + half)
+                if dist >= self._reach:
+                    # Ahead, the point becomes the end of the segment
+                    self._lo, self._hi = lo, hi
+                    self._reach = dist
+                    self._heading = phi
+                    self._data[self._size - 1] = p
+                    return
+                if lo <= self._heading <= hi:
+                    # Behind, but still within tol of the segment
+                    self._lo, self._hi = lo, hi
+                    return
+        else:
+            last = self._data[self._size - 1]
+            if np.hypot(p[0] - last[0], p[1] - last[1]) <= tol:
+                return
+        # Start a new segment anchored at the last vertex
+        anchor = self._data[self._size - 1]
+        dx, dy = p[0] - anchor[0], p[1] - anchor[1]
+        dist = np.hypot(dx, dy)
+        half = np.arcsin(tol / dist) if dist > tol else 0.5 * np.pi
+        self._reference = np.arctan2(dy, dx)
+        self._lo, self._hi = -half, half
+        self._reach = dist
+        self._heading = 0.0
+        self._open = True
+        self._push(p)
+
+    def extend(self, points):
+        for p in ensure(points):
+            self.append(p)
+
+    def _angle(self, dx, dy):
+        # Direction relative to the segment reference, wrapped to [-pi, pi)
+        a = np.arctan2(dy, dx) - self._reference
+        return (a + np.pi) % (2 * np.pi) - np.pi
+
+    def _push(self, p):
+        self._reserve(self._size + 1)
+        self._data[self._size] = p
+        self._size += 1
+
+    def _reserve(self, n):
+        if n > len(self._data):
+            data = np.zeros((max(n, 2 * len(self._data)), 2), dtype=float)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
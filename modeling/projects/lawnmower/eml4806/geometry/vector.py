@@ -1,39 +1,107 @@
+import math
 import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
 
-def vector(x, y):
+# Array-first 2-D vector helpers.
+# Inputs are either a single vector, shape (2,), or rows of vectors, shape (N, 2), and results
+# follow row-wise. Functions that produce arrays accept an optional out= buffer of the result
+# shape. Single vectors given as tuples, lists or (2,) arrays take a scalar fast path, and
+# only they give scalar results: any (N, 2) input, (1, 2) included, gives an (N,) array.
+
+def _pair(v):
+    # (x, y) floats for a single 2-D vector, None for anything else
+    if type(v) in (tuple, list) and len(v) == 2:
+        x, y = v
+        if type(x) in (float, int) and type(y) in (float, int):
+            return float(x), float(y)
+    elif type(v) is np.ndarray and v.shape == (2,):
+        return float(v[0]), float(v[1])
+    return None
+
+def _result(shape, out):
+    if out is None:
+        return np.empty(shape, dtype=float)
+    if out.shape != shape:
+        raise ValueError(f"Output buffer must have shape {shape}, got {out.shape}.")
+    return out
+
+def vector(x, y, out=None):
     """
     Create a vector or array of vectors from scalars or arrays.
     Scalars are broadcast to match array shapes.
     """
+    if np.ndim(x) == 0 and np.ndim(y) == 0:
+        o = _result((1, 2), out)
+        o[0, 0] = x
+        o[0, 1] = y
+        return o
     X, Y = np.broadcast_arrays(np.asarray(x, float), np.asarray(y, float))
-    return np.column_stack((X, Y))
+    X, Y = X.ravel(), Y.ravel()
+    o = _result((len(X), 2), out)
+    o[:, 0] = X
+    o[:, 1] = Y
+    return o
 
-def null():
-    return np.array([0.0, 0.0], dtype=float)
+def null(out=None):
+    o = _result((2,), out)
+    o[:] = 0.0
+    return o
 
-def length(v1):
-    v = np.asarray(v1)
-    return np.linalg.norm(v) # np.sqrt(v[0]**2 + v[1]**2)
+def length(v1, out=None):
+    p = _pair(v1)
+    if p is not None and out is None:
+        return math.hypot(*p)
+    v = np.asarray(v1, dtype=float)
+    if v.ndim == 1:
+        return float(np.hypot(v[0], v[1]))
+    return np.hypot(v[:, 0], v[:, 1], out=_result((len(v),), out))
 
 def coincident(v1, v2, tol=1e-2):
-    v1 = np.asarray(v1)
-    v2 = np.asarray(v2)
-    return np.allclose(v1, v2, atol=tol) # length(v1 - v2) <= tol
-
-def unit(v1):
-    v = np.asarray(v1)
-    l = length(v)
-    if l <= 0:
-        return null()
-    else:
-        return v / l
+    # Component-wise closeness, as np.allclose(v1, v2, atol=tol) for each row
+    p, q = _pair(v1), _pair(v2)
+    if p is not None and q is not None:
+        return (abs(p[0] - q[0]) <= tol + 1e-5 * abs(q[0])) and (abs(p[1] - q[1]) <= tol + 1e-5 * abs(q[1]))
+    v1 = np.asarray(v1, dtype=float)
+    v2 = np.asarray(v2, dtype=float)
+    close = np.abs(v1 - v2) <= tol + 1e-5 * np.abs(v2)
+    if close.ndim == 1:
+        return bool(close.all())
+    return close.all(axis=-1)
 
-def perpendicular(v, clockwise=False, normalize=False):
-    u = np.asarray(v)
+def unit(v1, out=None):
+    p = _pair(v1)
+    if p is not None and out is None:
+        l = math.hypot(*p)
+        if l <= 0:
+            return null()
+        return np.array([p[0] / l, p[1] / l])
+    v = np.asarray(v1, dtype=float)
+    o = _result(v.shape, out)
+    if v.ndim == 1:
+        l = length(v)
+        if l <= 0:
+            o[:] = 0.0
+        else:
+            np.divide(v, l, out=o)
+        return o
+    l = np.hypot(v[:, 0], v[:, 1])[:, None]
+    np.divide(v, l, out=o, where=l > 0)
+    o[(l <= 0)[:, 0]] = 0.0
+    return o
+
+def perpendicular(v, clockwise=False, normalize=False, out=None):
+    u = np.asarray(v, dtype=float)
+    o = _result(u.shape, out)
+    x, y = u[..., 0].copy(), u[..., 1].copy()
     if clockwise:
-        return vector(v[1], -v[0])
+        o[..., 0] = y
+        o[..., 1] = -x
     else:
-        vector(-v[1], v[0])
+        o[..., 0] = -y
+        o[..., 1] = x
+    if normalize:
+        unit(o, out=o)
+    return o
 
 def split(v):
     v = np.asarray(v)
@@ -45,11 +113,78 @@ def split(v):
         return v[:, 0], v[:, 1]
     raise ValueError("Input must be shape (2,) or (N, 2).")
 
+class Points2D(NDArrayOperatorsMixin):
+    """
+    A validated, contiguous float64 (N, 2) point buffer.
+    ensure() returns its data in O(1), so points passed around as Points2D (polygons,
+    planned paths) are never re-validated. Arithmetic and ufuncs act on the data and
+    return plain arrays.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, points=None):
+        self.data = np.array(ensure(points), dtype=float, order="C")
+
+    @classmethod
+    def wrap(cls, array):
+        # Trusted (N, 2) float64 array, no validation or copy
+        p = cls.__new__(cls)
+        p.data = array
+        return p
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def x(self):
+        return self.data[:, 0]
+
+    @property
+    def y(self):
+        return self.data[:, 1]
+
+    def copy(self):
+        return Points2D.wrap(self.data.copy())
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def __setitem__(self, index, value):
+        self.data[index] = value
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = tuple(i.data if type(i) is Points2D else i for i in inputs)
+        if "out" in kwargs:
+            kwargs["out"] = tuple(o.data if type(o) is Points2D else o for o in kwargs["out"])
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None or dtype == self.data.dtype:
+            return self.data.copy() if copy else self.data
+        return self.data.astype(dtype)
+
+    def __repr__(self):
+        return f"Points2D({self.data!r})"
+
 def ensure(points):
     """
     Convert any 2-D vector input into a NumPy array of shape (N, 2).
     If points is None or empty, return an empty (0, 2) array.
     """
+    # Fast paths, already normalized (other dtypes and strided arrays are converted)
+    if type(points) is Points2D:
+        return points.data
+    if type(points) is np.ndarray and points.ndim == 2 and points.shape[1] == 2 and len(points):
+        return np.ascontiguousarray(points, dtype=float)
+
     if points is None or len(points) == 0:
         return np.zeros((0, 2), dtype=float)
 
@@ -57,7 +192,7 @@ def ensure(points):
 
     # Already correct shape (N, 2)
     if arr.ndim == 2 and arr.shape[1] == 2:
-        return arr
+        return np.ascontiguousarray(arr, dtype=float)
 
     # Shape (2, N) → treat as [x[], y[]]
     if arr.ndim == 2 and arr.shape[0] == 2:
@@ -76,11 +211,11 @@ def ensure(points):
     except:
         raise ValueError("Input cannot be interpreted as a sequence of 2D vectors.")
 
-def append(points, new_points):
+def append(points, new_points, out=None):
     """
     Append one or more 2D vectors to an existing point array.
-    Uses ensure_points_2d() so both inputs are normalized to (N,2).
+    Uses ensure() so both inputs are normalized to (N,2).
     """
     p = ensure(points)
     q = ensure(new_points)
-    return np.vstack([p, q])
+    return np.concatenate((p, q), out=_result((len(p) + len(q), 2), out))
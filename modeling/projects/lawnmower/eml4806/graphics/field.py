@@ -0,0 +1,55 @@
+import numpy as np
+
+from eml4806.field.map import OCCUPANCY, GRASS
+
+##############################################################################################
+
+# Grass type colors (RGBA), obstacles are drawn on top in a single color
+GRASS_COLORS = np.array([
+    [0.60, 0.80, 0.45, 1.0],   # 0 lawn
+    [0.35, 0.65, 0.25, 1.0],   # 1 tall grass
+    [0.80, 0.90, 0.60, 1.0],   # 2 mowed
+    [0.75, 0.65, 0.45, 1.0],   # 3 soil
+], dtype=np.float32)
+OBSTACLE_COLOR = np.array([0.3, 0.3, 0.3, 1.0], dtype=np.float32)
+
+class FieldImage:
+    """
+    Draws a FieldMap through a single imshow artist.
+
+    Each tile is reduced to pixels x pixels image cells (nearest sampling), and only tiles whose
+    version changed since the last update are re-rendered before the artist data is swapped.
+    """
+
+    def __init__(self, workspace, field, pixels=32, colors=GRASS_COLORS, obstacle=OBSTACLE_COLOR):
+        if field.tile % pixels != 0:
+            raise ValueError("Pixels per tile must divide the tile size.")
+        self.field = field
+        self.pixels = int(pixels)
+        self.colors = np.asarray(colors, dtype=np.float32)
+        self.obstacle = np.asarray(obstacle, dtype=np.float32)
+        ty, tx = field.tiles
+        self._image = np.zeros((ty * pixels, tx * pixels, 4), dtype=np.float32)
+        self._seen = np.full(field.tiles, -1, dtype=np.int64)
+        extent = field.tile * field.resolution
+        self._artist = workspace.axis.imshow(
+            self._image, origin="lower", interpolation="nearest", zorder=0,
+            extent=(field.xmin, field.xmin + tx * extent, field.ymin, field.ymin + ty * extent))
+        self.update()
+
+    def update(self):
+        dirty = np.argwhere(self.field.version != self._seen)
+        if len(dirty) == 0:
+            return False
+        p = self.pixels
+        s = self.field.tile // p
+        occupancy = self.field.layer(OCCUPANCY)
+        grass = self.field.layer(GRASS)
+        for tr, tc in dirty:
+            codes = np.minimum(grass[tr, tc, ::s, ::s], len(self.colors) - 1)
+            rgba = self.colors[codes]
+            rgba[occupancy[tr, tc, ::s, ::s] != 0] = self.obstacle
+            self._image[tr * p:(tr + 1) * p, tc * p:(tc + 1) * p] = rgba
+        self._seen[:] = self.field.version
+        self._artist.set_data(self._image)
+        return True
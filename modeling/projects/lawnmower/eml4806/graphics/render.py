@@ -0,0 +1,76 @@
+import os
+import multiprocessing as mp
+import numpy as np
+
+##############################################################################################
+
+# Offline rendering of recorded runs.
+#
+# The pose timeline is split into contiguous time chunks. Each worker process builds its own
+# headless Workspace and Robot once (Agg canvas, no window), replays its chunk and writes globally
+# numbered frames, so the output of all workers forms a single frame sequence, e.g.
+#
+#   ffmpeg -framerate 10 -i frames/frame_%06d.png run.mp4
+#
+# Workers are seeded with the path driven before their chunk, simplified online exactly as the
+# live path was, so every frame matches a sequential render.
+
+def render(poses, bounds, chassis, wheels, motors, blade, odometer,
+           folder="frames", prefix="frame", processes=None, chunks=None, dpi=None, debug=False):
+    """
+    Render a recorded pose timeline into numbered image frames. poses is shaped (T, 3) with
+    columns x, y, theta or (T, 5) with the wheel speeds vl, vr as well (drawn in debug mode).
+    Returns the ordered list of frame filenames.
+    """
+    poses = np.asarray(poses, dtype=float)
+    if poses.ndim != 2 or poses.shape[1] < 3:
+        raise ValueError("Poses must be shaped (T, 3) with columns x, y, theta, or (T, 5) with vl, vr.")
+    if poses.shape[1] < 5:
+        poses = np.column_stack((poses[:, :3], np.zeros((len(poses), 2))))
+    os.makedirs(folder, exist_ok=True)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if chunks is None:
+        chunks = processes
+    chunks = max(1, min(int(chunks), len(poses)))
+
+    tasks = []
+    for index in np.array_split(np.arange(len(poses)), chunks):
+        start, stop = int(index[0]), int(index[-1]) + 1
+        # Each chunk only needs the timeline up to its last frame
+        tasks.append((poses[:stop, :5], start, bounds, chassis, wheels, motors, blade, odometer,
+                      folder, prefix, dpi, debug))
+
+    if processes == 1:
+        frames = [_render_chunk(task) for task in tasks]
+    else:
+        # Spawn gives every worker a clean state regardless of the parent
+        with mp.get_context("spawn").Pool(processes) as pool:
+            frames = pool.map(_render_chunk, tasks)
+    # Stitch
+    return [f for chunk in frames for f in chunk]
+
+
+def _render_chunk(task):
+    poses, start, bounds, chassis, wheels, motors, blade, odometer, folder, prefix, dpi, debug = task
+
+    from eml4806.graphics.workspace import Workspace
+    from eml4806.robot.skidsteer import Robot
+
+    xmin, xmax, ymin, ymax = bounds
+    workspace = Workspace(xmin, xmax, ymin, ymax, interactive=False)
+    x, y, theta = poses[start, :3]
+    robot = Robot(workspace, x, y, theta, chassis, wheels, motors, blade, odometer)
+    robot.setDebug(debug)
+    # Path history driven before this chunk
+    robot.path.setPoints(poses[:start + 1, :2], online=True)
+
+    frames = []
+    for k in range(start, len(poses)):
+        # Full odometer state, so the debug wheel arrows match the live run
+        robot.place(*poses[k])
+        filename = os.path.join(folder, f"{prefix}_{k:06d}.png")
+        workspace.save(filename, dpi=dpi)
+        frames.append(filename)
+    workspace.close()
+    return frames
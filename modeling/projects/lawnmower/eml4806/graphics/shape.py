@@ -4,10 +4,11 @@ from abc import ABC, abstractmethod
 import matplotlib.pyplot as plt
 from matplotlib.patches import FancyArrowPatch as ArrowPatch
 
-from eml4806.geometry.vector import vector, ensure, append
+from eml4806.geometry.vector import vector, ensure, append, Points2D
 from eml4806.graphics.workspace import Workspace
 from eml4806.graphics.style import Color, Stroke, Fill, Style
 from eml4806.geometry.transform import Transform
+from eml4806.geometry.simplify import Simplifier
 
 ###############################################################
 
@@ -17,12 +18,17 @@ class Drawable(ABC):
     def __init__(self, transform, parent=None):
         self._transform = transform.clone()
         self._parent = parent
+        self._workspace = None
+        # Viewport culling: cached local bounding box, culled while outside the axes limits
+        self._local = None
+        self._culled = False
 
     def transform(self):
         return self._transform.clone()
 
     def setTransform(self, value):
         self._transform = value.clone()
+        self._moved()
         self._updateTransform()
 
     def move(self, x, y, relative=False):
@@ -30,6 +36,7 @@ class Drawable(ABC):
             self._transform.position += (x, y)
         else:
             self._transform.position = (x, y)
+        self._moved()
         self._updateTransform()
 
     def rotate(self, angle, relative=False):
@@ -37,6 +44,7 @@ class Drawable(ABC):
             self._transform.orientation += float(angle)
         else:
             self._transform.orientation = float(angle)
+        self._moved()
         self._updateTransform()
 
     def scale(self, sx, sy=None, relative=False):
@@ -46,11 +54,67 @@ class Drawable(ABC):
             self._transform.scale += (sx, sy)
         else:
             self._transform.scale = (sx, sy)
+        self._moved()
         self._updateTransform()
 
     def setParent(self, parent):
         self._parent = parent
 
+    def worldTransform(self):
+        if self._parent is None:
+            return self._transform.clone()
+        return Transform.compound(self._parent.worldTransform(), self._transform)
+
+    def bbox(self, world=None):
+        """
+        World-space (xmin, ymin, xmax, ymax) bounding box, None when there is nothing to draw.
+        world is the world transform when the caller already has it.
+        """
+        corners = self._corners()
+        if corners is None:
+            return None
+        w = (self.worldTransform() if world is None else world).apply(corners)
+        return (w[:, 0].min(), w[:, 1].min(), w[:, 0].max(), w[:, 1].max())
+
+    def culled(self):
+        return self._culled
+
+    def _visible(self, world=None):
+        return self._workspace is None or self._workspace.visible(self.bbox(world))
+
+    def _setCulled(self, culled, register=True):
+        if culled != self._culled:
+            self._culled = culled
+            self._showArtist()
+        if register and self._workspace is not None:
+            self._workspace.cull(self, culled)
+
+    def _corners(self):
+        # Corners of the cached local bounding box
+        if self._local is None:
+            self._local = self._bounds()
+        if self._local is None:
+            return None
+        x0, y0, x1, y1 = self._local
+        return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]])
+
+    def _invalidate(self):
+        # Local geometry changed, so did the bounding box of every ancestor
+        self._local = None
+        if self._parent is not None:
+            self._parent._invalidate()
+
+    def _moved(self):
+        # Own bounding box is local, only the parent's one depends on this transform
+        if self._parent is not None:
+            self._parent._invalidate()
+
+    @abstractmethod
+    def _bounds(self): ...
+
+    @abstractmethod
+    def _showArtist(self): ...
+
     @abstractmethod
     def _updateTransform(self): ...
 
@@ -65,11 +129,47 @@ class Group(Drawable):
         self._children = list(children)
         for child in self._children:
             child.setParent(self)
+            if self._workspace is None:
+                self._workspace = child._workspace
+
+    def hide(self):
+        for child in self._children:
+            child.hide()
+
+    def show(self):
+        for child in self._children:
+            child.show()
 
     def _updateTransform(self):
+        # A single box test culls the whole group without touching its children
+        if not self._visible(self.worldTransform()):
+            self._setCulled(True)
+            return
+        self._setCulled(False)
         for child in self._children:
             child._updateTransform()
 
+    def _setCulled(self, culled, register=True):
+        super()._setCulled(culled, register)
+        if culled:
+            for child in self._children:
+                child._setCulled(True, register=False)
+
+    def _bounds(self):
+        # Union of the children boxes in the group frame
+        boxes = []
+        for child in self._children:
+            corners = child._corners()
+            if corners is not None:
+                boxes.append(child._transform.apply(corners))
+        if not boxes:
+            return None
+        p = np.concatenate(boxes)
+        return (p[:, 0].min(), p[:, 1].min(), p[:, 0].max(), p[:, 1].max())
+
+    def _showArtist(self):
+        pass
+
 
 ###############################################################
 
@@ -78,33 +178,54 @@ class Shape(Drawable):
 
     def __init__(self, workspace, style, transform):
         super().__init__(transform)
+        self._workspace = workspace
         self._ax = workspace.axis
         self._style = style
         self._artist = None
+        self._hidden = False
         self._make()
         self._updateTransform()
         self._updateStyle()
 
     def hide(self):
-        self._artist.set_visible(False)
+        self._hidden = True
+        self._showArtist()
 
     def show(self):
-        self._artist.set_visible(True)        
+        self._hidden = False
+        self._showArtist()
+
+    def _showArtist(self):
+        # Culled artists are skipped by the renderer until they are back in view
+        self._artist.set_visible(not (self._hidden or self._culled))
 
     def style(self):
-        return self._style.clone()
+        return self._style
 
     def setStyle(self, value):
-        self._style = value.clone()
+        # Styles are immutable flyweights, equal styles are the same object
+        if value is self._style:
+            return
+        self._style = value
         self._updateStyle()
 
+    def vertices(self, world=None):
+        return (self.worldTransform() if world is None else world).apply(self._shape())
+
     def _updateTransform(self):
-        if self._parent is None:
-            T = self._transform
-        else:
-            T = Transform.compound(self._parent._transform, self._transform)
-        o = T.apply(self._shape())
-        self._updateShape(o)
+        # The world transform walks the parent chain, so it is composed once for both uses
+        world = self.worldTransform()
+        if not self._visible(world):
+            self._setCulled(True)
+            return
+        self._setCulled(False)
+        self._updateShape(self.vertices(world))
+
+    def _bounds(self):
+        p = ensure(self._shape())
+        if len(p) == 0:
+            return None
+        return (p[:, 0].min(), p[:, 1].min(), p[:, 0].max(), p[:, 1].max())
 
     @abstractmethod
     def _shape(self): ...
@@ -137,8 +258,8 @@ class Plot(Shape):
     def _updateStyle(self):
         s = self._style
         if s.stroke is not None:
-            self._artist.set_color(s.stroke.color.color)
-            self._artist.set_linewidth(s.stroke.width)
+            self._artist.set_color(s.edgecolor)
+            self._artist.set_linewidth(s.linewidth)
         self._artist.set_alpha(s.opacity)
 
 
@@ -160,10 +281,10 @@ class Fill(Shape):
     def _updateStyle(self):
         s = self._style
         if s.fill is not None:
-            self._artist.set_facecolor(s.fill.color.color)
+            self._artist.set_facecolor(s.facecolor)
         if s.stroke is not None:
-            self._artist.set_edgecolor(s.stroke.color.color)
-            self._artist.set_linewidth(s.stroke.width)
+            self._artist.set_edgecolor(s.edgecolor)
+            self._artist.set_linewidth(s.linewidth)
         self._artist.set_alpha(s.opacity)
 
 
@@ -213,48 +334,115 @@ class Circle(Fill):
 class Polygon(Fill):
 
     def __init__(self, workspace, edges, style=Style.defaultBrush()):
-        self._points = ensure(edges)
-        super().__init__(workspace, style)
+        self._points = Points2D(edges)
+        super().__init__(workspace, style, Transform())
 
     def points(self):
-        return self._points.copy()
+        return self._points.data.copy()
     
     def setPoints(self, points):
-        self._parent = ensure(points)
+        self._points = Points2D(points)
+        self._invalidate()
+        self._updateTransform()
     
     def append(self, edges):
-        self._points = np.vstack([self._points, edges.ensure()])
+        self._points = Points2D.wrap(append(self._points, edges))
+        self._invalidate()
+        self._updateTransform()
 
     def _shape(self):
-        return self._points
+        return self._points.data
 
 ###############################################################
 
 class Polyline(Plot):
 
-    def __init__(self, workspace, edges=[], style=Style.defaultPen()):
-        self._points = ensure(edges)
+    # tolerance : online simplification of the stored points (m)
+    # resolution: view-dependent level of detail of the drawn points (pixels)
+    def __init__(self, workspace, edges=[], style=Style.defaultPen(), tolerance=0.0, resolution=0.0):
+        self._path = Simplifier(tolerance, edges)
+        self._view = Simplifier(0.0, self._path.points())
+        self._resolution = float(resolution)
+        self._views = 0
         super().__init__(workspace, style, Transform())
+        if self._resolution > 0.0:
+            self._ax.callbacks.connect("xlim_changed", self._onView)
+            self._ax.callbacks.connect("ylim_changed", self._onView)
+            self._refine()
 
     def points(self):
-        return self._points.copy()
+        return self._path.points().copy()
     
-    def setPoints(self, points):
-        self._points = ensure(points)
-        self._updateShape(self._points)
+    # online: keep the vertices the path would hold had the points been appended one by one,
+    # otherwise the points are simplified as a whole
+    def setPoints(self, points, online=False):
+        if online:
+            self._path.reset()
+            self._path.extend(points)
+        else:
+            self._path.reset(points)
+        self._invalidate()
+        self._refine()
     
     def append(self, edges):
-        self._points = append(self._points, edges)
-        self._updateShape(self._points)
+        edges = ensure(edges)
+        for p in edges:
+            self._path.append(p)
+            self._view.append(p)
+        self._extend(edges)
+        # The box only grows, so a visible path needs a new test only after a pan or zoom
+        if self._culled or self._views != self._workspace.views:
+            self._updateTransform()
+        else:
+            self._updateShape(self._view.points())
 
     def last(self):
-        return self._points[-1,:]
+        return self._path.last().copy()
+
+    def clear(self):
+        self.setPoints([])
 
-    def clear(self, edges):
-        self._points = ensure([])
+    def _updateTransform(self):
+        self._views = self._workspace.views
+        super()._updateTransform()
 
     def _shape(self):
-        return self._points
+        return self._view.points()
+
+    def _bounds(self):
+        p = self._path.points()
+        if len(p) == 0:
+            return None
+        return (p[:, 0].min(), p[:, 1].min(), p[:, 0].max(), p[:, 1].max())
+
+    def _extend(self, edges):
+        if self._local is None or len(edges) == 0:
+            self._invalidate()
+            return
+        x0, y0, x1, y1 = self._local
+        self._local = (min(x0, edges[:, 0].min()), min(y0, edges[:, 1].min()),
+                       max(x1, edges[:, 0].max()), max(y1, edges[:, 1].max()))
+        if self._parent is not None:
+            self._parent._invalidate()
+
+    def _onView(self, ax):
+        if not math.isclose(self._pixel(), self._view.tolerance, rel_tol=1e-3):
+            self._refine()
+
+    def _pixel(self):
+        # Data units covered by the requested number of screen pixels
+        if self._resolution <= 0.0:
+            return 0.0
+        box = self._ax.get_window_extent()
+        x0, x1 = self._ax.get_xlim()
+        y0, y1 = self._ax.get_ylim()
+        size = max(abs(x1 - x0) / max(box.width, 1.0), abs(y1 - y0) / max(box.height, 1.0))
+        return self._resolution * size
+
+    def _refine(self):
+        self._view = Simplifier(self._pixel(), self._path.points())
+        if not self._culled:
+            self._updateShape(self._view.points())
 
 ###############################################################
 
@@ -271,11 +459,13 @@ class Arrow(Shape):
     def setPosition(self, x, y):
         self._x = x
         self._y = y
+        self._invalidate()
         self._updateTransform()
 
     def setSize(self, dx, dy):
         self._dx = dx
         self._dy = dy
+        self._invalidate()
         self._updateTransform()
 
     def _make(self):
@@ -288,10 +478,10 @@ class Arrow(Shape):
     def _updateStyle(self):
         s = self._style
         if s.fill is not None:
-            self._artist.set_facecolor(s.fill.color.color)
+            self._artist.set_facecolor(s.facecolor)
         if s.stroke is not None:
-            self._artist.set_edgecolor(s.stroke.color.color)
-            self._artist.set_linewidth(s.stroke.width)
+            self._artist.set_edgecolor(s.edgecolor)
+            self._artist.set_linewidth(s.linewidth)
         self._artist.set_alpha(s.opacity)
 
     def _shape(self):
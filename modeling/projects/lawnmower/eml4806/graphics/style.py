@@ -1,52 +1,130 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Optional
+import weakref
 
 #######################################################
 
-class Color:
+# Colors, strokes, fills and styles are immutable flyweights: constructing one with the same
+# values returns the same object, so shapes share them freely and never need to copy them.
+# Each value is converted once into the RGBA tuples matplotlib expects.
+
+class _Flyweight:
+
+    __slots__ = ("__weakref__",)
+
+    def __new__(cls, key):
+        pool = cls.__dict__.get("_pool")
+        if pool is None:
+            pool = cls._pool = weakref.WeakValueDictionary()
+        value = pool.get(key)
+        if value is None:
+            value = object.__new__(cls)
+            value._build(*key)
+            pool[key] = value
+        return value
+
+    def _set(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
-    def __init__(self, r: float = 0.0, g: float = 0.0, b: float = 1.0):
-        self.color = (r, g, b)
-    
     def clone(self):
-        return Color(r=self.r, g=self.g, b=self.b)
+        return self
 
 
 #######################################################
 
 
-@dataclass
-class Stroke:
+class Color(_Flyweight):
 
-    color: Color 
-    width: float = 1.0
+    __slots__ = ("r", "g", "b", "color")
 
-    def clone(self):
-        return Stroke(color=self.color, width=self.width)
+    def __new__(cls, r: float = 0.0, g: float = 0.0, b: float = 1.0):
+        return super().__new__(cls, (float(r), float(g), float(b)))
+
+    def _build(self, r, g, b):
+        self._set(r=r, g=g, b=b, color=(r, g, b))
+
+    def rgba(self, alpha: float = 1.0):
+        return (self.r, self.g, self.b, float(alpha))
+
+    def __reduce__(self):
+        return (Color, self.color)
+
+    def __repr__(self):
+        return f"Color({self.r}, {self.g}, {self.b})"
 
 
 #######################################################
 
 
-@dataclass
-class Fill:
+class Stroke(_Flyweight):
 
-    color: Color
+    __slots__ = ("color", "width")
 
-    def clone(self):
-        return Fill(color=self.color)
+    def __new__(cls, color: Color, width: float = 1.0):
+        return super().__new__(cls, (color, float(width)))
+
+    def _build(self, color, width):
+        self._set(color=color, width=width)
+
+    def __reduce__(self):
+        return (Stroke, (self.color, self.width))
+
+    def __repr__(self):
+        return f"Stroke({self.color!r}, {self.width})"
 
 
 #######################################################
 
 
-class Style:
+class Fill(_Flyweight):
+
+    __slots__ = ("color",)
 
-    def __init__(self, stroke: Stroke = None, fill: Fill = None, opacity = 0.5):
-        self.stroke = stroke
-        self.fill = fill
-        self.opacity = float(opacity)
+    def __new__(cls, color: Color):
+        return super().__new__(cls, (color,))
+
+    def _build(self, color):
+        self._set(color=color)
+
+    def __reduce__(self):
+        return (Fill, (self.color,))
+
+    def __repr__(self):
+        return f"Fill({self.color!r})"
+
+
+#######################################################
+
+
+class Style(_Flyweight):
+
+    # edgecolor/facecolor are the RGBA tuples handed to matplotlib, with the opacity as alpha
+    __slots__ = ("stroke", "fill", "opacity", "edgecolor", "facecolor", "linewidth")
+
+    def __new__(cls, stroke: Stroke = None, fill: Fill = None, opacity = 0.5):
+        return super().__new__(cls, (stroke, fill, float(opacity)))
+
+    def _build(self, stroke, fill, opacity):
+        self._set(
+            stroke=stroke,
+            fill=fill,
+            opacity=opacity,
+            edgecolor=stroke.color.rgba(opacity) if stroke is not None else None,
+            facecolor=fill.color.rgba(opacity) if fill is not None else None,
+            linewidth=stroke.width if stroke is not None else None,
+        )
 
     def has_fill(self):
         return self.fill is not None and self.opacity > 0.0
@@ -54,17 +132,16 @@ class Style:
     def has_stroke(self):
         return (self.stroke is not None and self.opacity > 0.0 and self.stroke.width > 0.0)
 
-    def clone(self):
-        return Style(
-            stroke=self.stroke.clone() if self.stroke is not None else None,
-            fill=self.fill.clone() if self.fill is not None else None,
-            opacity=self.opacity,
-        )
+    def __reduce__(self):
+        return (Style, (self.stroke, self.fill, self.opacity))
+
+    def __repr__(self):
+        return f"Style({self.stroke!r}, {self.fill!r}, {self.opacity})"
 
     @classmethod
     def pen(cls, color, opacity = 1.0, width = 1.0):
         return cls(stroke=Stroke(color, width), opacity=opacity)
-    
+
     @classmethod
     def brush(cls, color, opacity = 1.0, width = 1.0):
         return cls(stroke=Stroke(color, width), fill=Fill(color), opacity=opacity)
@@ -72,8 +149,7 @@ class Style:
     @classmethod
     def defaultPen(cls):
         return cls.pen(Color(0.0, 0.0, 0.0), opacity=0.75)
-        
+
     @classmethod
     def defaultBrush(cls):
         return cls.brush(Color(0.0,0.0,0.0), opacity=0.75)
-    
\ No newline at end of file
@@ -1,19 +1,77 @@
+import weakref
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from eml4806.graphics.hud import Hud
 
 class Workspace:
-    def __init__(self, xmin, xmax, ymin, ymax):
-        plt.ion()
-        self.figure, self.axis = plt.subplots(figsize=(12, 12))
+    def __init__(self, xmin, xmax, ymin, ymax, interactive=True):
+        # Headless workspaces (offline rendering) never open a window: their figure is drawn
+        # by its own Agg canvas, outside pyplot, so the caller's backend is left untouched
+        self._interactive = interactive
+        if interactive:
+            plt.ion()
+            self.figure, self.axis = plt.subplots(figsize=(12, 12))
+        else:
+            self.figure = Figure(figsize=(12, 12))
+            FigureCanvasAgg(self.figure)
+            self.axis = self.figure.subplots()
         self.axis.set_xlim(xmin, xmax)
         self.axis.set_ylim(ymin, ymax)
         self.axis.set_aspect("equal")
         self.axis.grid(True)
+        # Viewport culling: cached axes limits and the drawables currently outside them
+        self._limits = None
+        self.views = 0
+        self._culled = weakref.WeakSet()
+        self._onView(self.axis)
+        self._huds = []
+        self.axis.callbacks.connect("xlim_changed", self._onView)
+        self.axis.callbacks.connect("ylim_changed", self._onView)
+
+    def visible(self, box):
+        # box is a world (xmin, ymin, xmax, ymax) bounding box, None for empty drawables
+        if box is None:
+            return True
+        x0, x1, y0, y1 = self._limits
+        return box[2] >= x0 and box[0] <= x1 and box[3] >= y0 and box[1] <= y1
+
+    def cull(self, drawable, culled):
+        if culled:
+            self._culled.add(drawable)
+        else:
+            self._culled.discard(drawable)
+
+    def _onView(self, ax):
+        x0, x1 = self.axis.get_xlim()
+        y0, y1 = self.axis.get_ylim()
+        self._limits = (min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1))
+        self.views += 1
+        # Culled drawables re-test themselves and catch up on the vertices they skipped
+        for drawable in list(self._culled):
+            drawable._updateTransform()
+
+    def hud(self, slots, period=0.2, **options):
+        # Text overlay refreshed by update(), see Hud
+        hud = Hud(self.axis, slots, period, **options)
+        self._huds.append(hud)
+        return hud
 
     def update(self):
+        for hud in self._huds:
+            hud.refresh()
         self.figure.canvas.draw_idle()
         self.figure.canvas.flush_events()
 
+    def save(self, filename, dpi=None):
+        self.figure.savefig(filename, dpi=dpi)
+
+    def close(self):
+        plt.close(self.figure)
+
     def __del__(self):
-        plt.ioff()
-        plt.show()
\ No newline at end of file
+        if self._interactive:
+            plt.ioff()
+            plt.show()
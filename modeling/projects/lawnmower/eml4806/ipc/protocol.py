@@ -0,0 +1,63 @@
+import struct
+import numpy as np
+
+##############################################################################################
+
+# Binary framing shared by the simulation server and its clients.
+#
+# Every frame is a 5-byte little-endian header (message type, payload length) followed by the
+# payload. Telemetry carries all robots of a tick as one packed record array. The payload
+# length comes from the peer, so it is checked before anything is buffered: commands and
+# subscriptions have a fixed size and no frame may exceed MAXIMUM_FRAME.
+
+HEADER = struct.Struct("<BI")
+
+COMMAND   = 1 # client -> server: wheel speeds of one robot
+SUBSCRIBE = 2 # client -> server: telemetry every n ticks (0 stops it)
+TELEMETRY = 3 # server -> client: poses of every robot
+
+MAXIMUM_FRAME = 1 << 26 # bytes of payload, telemetry of ~2.8 million robots
+
+_COMMAND   = struct.Struct("<Idd")   # robot id, vl, vr (m/s)
+_SUBSCRIBE = struct.Struct("<I")     # decimation
+_TICK      = struct.Struct("<Qd")    # tick, simulated time (s)
+
+_SIZES = {COMMAND: _COMMAND.size, SUBSCRIBE: _SUBSCRIBE.size}
+
+RECORD = np.dtype([("id", "<u4"), ("x", "<f4"), ("y", "<f4"), ("theta", "<f4"), ("vl", "<f4"), ("vr", "<f4")])
+
+def frame(kind, payload=b""):
+    return HEADER.pack(kind, len(payload)) + payload
+
+def command(id, vl, vr):
+    return frame(COMMAND, _COMMAND.pack(id, vl, vr))
+
+def subscribe(every=1):
+    return frame(SUBSCRIBE, _SUBSCRIBE.pack(every))
+
+def telemetry(tick, time, records):
+    return frame(TELEMETRY, _TICK.pack(tick, time) + np.ascontiguousarray(records, dtype=RECORD).tobytes())
+
+def parseCommand(payload):
+    return _COMMAND.unpack(payload)
+
+def parseSubscribe(payload):
+    return _SUBSCRIBE.unpack(payload)[0]
+
+def parseTelemetry(payload):
+    tick, time = _TICK.unpack_from(payload)
+    records = np.frombuffer(payload, dtype=RECORD, offset=_TICK.size)
+    return tick, time, records
+
+async def read(reader):
+    """
+    Read one frame, returns (kind, payload). Raises ValueError for oversized payloads and
+    fixed-size messages of the wrong size, before reading the payload.
+    """
+    kind, size = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if size > MAXIMUM_FRAME:
+        raise ValueError(f"Frame payload of {size} bytes exceeds {MAXIMUM_FRAME}.")
+    if kind in _SIZES and size != _SIZES[kind]:
+        raise ValueError(f"Frame of type {kind} must carry {_SIZES[kind]} bytes, got {size}.")
+    payload = await reader.readexactly(size) if size else b""
+    return kind, payload
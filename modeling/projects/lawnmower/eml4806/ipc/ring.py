@@ -0,0 +1,228 @@
+import copy
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+##############################################################################################
+
+# Shared-memory pose ring.
+#
+# The simulation publishes fleet poses, wheel speeds and path tails into a block of shared memory
+# that a viewer process maps directly, so nothing is pickled or sent through pipes and physics
+# never waits for rendering. Layout (native byte order, 8-byte aligned):
+#
+#   header  int64[8]          magic, robots, slots, tail, latest slot, tail head, tail seq, -
+#   seq     uint64[slots]     seqlock counter per slot (odd while being written)
+#   tick    uint64[slots]
+#   time    float64[slots]
+#   count   int64[slots]      robots in the slot
+#   pose    float64[slots, N, 3]
+#   wheel   float64[slots, N, 2]
+#   tail    float64[L, N, 2]  time-major ring of the last L positions
+#
+# The writer fills the slot after the latest one, so readers of the latest slot rarely race it.
+# Readers copy a slot and accept it only if its sequence number was even and unchanged. They
+# yield between attempts and give up after _RETRIES, so a writer that died mid-write (odd
+# sequence number forever) cannot make them spin.
+
+_MAGIC = 0x45_4D_4C_34_38_30_36   # "EML4806"
+_LATEST, _HEAD, _TAILSEQ = 4, 5, 6
+_RETRIES = 1000
+
+def _layout(robots, slots, tail):
+    fields = [
+        ("header", np.int64, (8,)),
+        ("seq", np.uint64, (slots,)),
+        ("tick", np.uint64, (slots,)),
+        ("time", np.float64, (slots,)),
+        ("count", np.int64, (slots,)),
+        ("pose", np.float64, (slots, robots, 3)),
+        ("wheel", np.float64, (slots, robots, 2)),
+        ("tail", np.float64, (tail, robots, 2)),
+    ]
+    offset, layout = 0, []
+    for name, dtype, shape in fields:
+        layout.append((name, dtype, shape, offset))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, offset
+
+##############################################################################################
+
+class PoseRing:
+    """
+    Seqlock-protected ring of pose frames in multiprocessing shared memory.
+    Create it in the simulation with create() and map it in the viewer with attach(name).
+    """
+
+    def __init__(self, memory, robots, slots, tail, owner):
+        self._memory = memory
+        self._owner = owner
+        self.robots, self.slots, self.tail_length = robots, slots, tail
+        layout, _ = _layout(robots, slots, tail)
+        self._shared = {name: np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+                        for name, dtype, shape, offset in layout}
+        # Reader buffers, reused on every read
+        self._pose = np.zeros((robots, 3))
+        self._wheel = np.zeros((robots, 2))
+
+    @property
+    def name(self):
+        return self._memory.name
+
+    @classmethod
+    def create(cls, robots, slots=4, tail=256, name=None):
+        _, size = _layout(robots, slots, tail)
+        memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        ring = cls(memory, robots, slots, tail, owner=True)
+        ring._shared["header"][:] = (_MAGIC, robots, slots, tail, -1, 0, 0, 0)
+        ring._shared["seq"][:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name):
+        try:
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching also registers the block with the resource tracker,
+            # which is harmless for processes started through multiprocessing (shared tracker)
+            memory = shared_memory.SharedMemory(name=name)
+        header = np.ndarray((8,), dtype=np.int64, buffer=memory.buf)
+        magic, robots, slots, tail = (int(v) for v in header[:4])
+        del header
+        if magic != _MAGIC:
+            memory.close()
+            raise ValueError(f"Shared memory {name} is not a pose ring.")
+        return cls(memory, robots, slots, tail, owner=False)
+
+    def close(self):
+        # Views must be released before the mapping can be closed
+        self._shared = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+    ##########################################################################################
+    # Writer
+
+    def publish(self, tick, time, poses, wheels=None):
+        m = self._shared
+        header = m["header"]
+        poses = np.asarray(poses, dtype=float).reshape(-1, 3)
+        n = len(poses)
+        s = (int(header[_LATEST]) + 1) % self.slots
+        m["seq"][s] += 1
+        m["tick"][s] = tick
+        m["time"][s] = time
+        m["count"][s] = n
+        m["pose"][s, :n] = poses
+        if wheels is not None:
+            m["wheel"][s, :n] = wheels
+        m["seq"][s] += 1
+        header[_LATEST] = s
+        # Path tails
+        head = int(header[_HEAD])
+        header[_TAILSEQ] += 1
+        m["tail"][head % self.tail_length, :n] = poses[:, :2]
+        header[_HEAD] = head + 1
+        header[_TAILSEQ] += 1
+
+    def publishFleet(self, fleet, tick, time):
+        self.publish(tick, time, fleet.poses(), np.column_stack((fleet.vl, fleet.vr)))
+
+    ##########################################################################################
+    # Reader
+
+    def latest(self):
+        """
+        Latest consistent frame as (tick, time, poses (N, 3), wheels (N, 2)), or None before
+        the first publish or when no consistent frame could be read. The arrays are reader
+        buffers overwritten by the next call.
+        """
+        m = self._shared
+        for _ in range(_RETRIES):
+            s = int(m["header"][_LATEST])
+            if s < 0:
+                return None
+            seq = int(m["seq"][s])
+            if not seq & 1:
+                tick, t, n = int(m["tick"][s]), float(m["time"][s]), int(m["count"][s])
+                np.copyto(self._pose[:n], m["pose"][s, :n])
+                np.copyto(self._wheel[:n], m["wheel"][s, :n])
+                if int(m["seq"][s]) == seq:
+                    return tick, t, self._pose[:n], self._wheel[:n]
+            time.sleep(0)
+        return None
+
+    def tails(self):
+        """
+        The last (up to L) positions of every robot, oldest first, shaped (N, K, 2), or None
+        when no consistent copy could be read.
+        """
+        m = self._shared
+        header = m["header"]
+        for _ in range(_RETRIES):
+            seq = int(header[_TAILSEQ])
+            if not seq & 1:
+                head = int(header[_HEAD])
+                k = min(head, self.tail_length)
+                rows = np.arange(head - k, head) % self.tail_length
+                tail = m["tail"][rows].transpose(1, 0, 2).copy()
+                if int(header[_TAILSEQ]) == seq:
+                    return tail
+            time.sleep(0)
+        return None
+
+##############################################################################################
+
+def view(name, bounds, chassis, wheels, motors, blade, odometer, interval=0.05, debug=True):
+    """
+    Viewer loop: map the ring and drive Workspace/Robot graphics from it until the figure
+    is closed. Meant to run in its own process (see start_viewer).
+    """
+    import matplotlib.pyplot as plt
+    from eml4806.graphics.workspace import Workspace
+    from eml4806.robot.skidsteer import Robot
+
+    ring = PoseRing.attach(name)
+    xmin, xmax, ymin, ymax = bounds
+    workspace = Workspace(xmin, xmax, ymin, ymax)
+    robots = []
+    shown = []
+    last = None
+    try:
+        while plt.fignum_exists(workspace.figure.number):
+            frame = ring.latest()
+            if frame is not None and frame[0] != last:
+                last, _, poses, speeds = frame
+                n = len(poses)
+                # Robots appear as the fleet grows, each with its own odometer
+                while len(robots) < n:
+                    x, y, theta = poses[len(robots)]
+                    robot = Robot(workspace, x, y, theta, chassis, wheels, motors, blade, copy.copy(odometer))
+                    robot.setDebug(debug)
+                    robots.append(robot)
+                shown.extend([True] * (len(robots) - len(shown)))
+                tails = ring.tails()
+                for k, robot in enumerate(robots):
+                    if k < n:
+                        robot.place(*poses[k], *speeds[k])
+                        if tails is not None:
+                            robot.path.setPoints(tails[k])
+                    # Robots past the fleet size are hidden until it grows again
+                    if (k < n) != shown[k]:
+                        robot.setVisible(k < n)
+                        shown[k] = k < n
+                workspace.update()
+            plt.pause(interval)
+    finally:
+        ring.close()
+
+def start_viewer(ring, bounds, chassis, wheels, motors, blade, odometer, interval=0.05, debug=True):
+    """
+    Spawn a viewer process for a ring created by the simulation.
+    """
+    process = mp.get_context("spawn").Process(
+        target=view, args=(ring.name, bounds, chassis, wheels, motors, blade, odometer, interval, debug), daemon=True)
+    process.start()
+    return process
@@ -0,0 +1,187 @@
+import asyncio
+import struct
+import numpy as np
+
+from eml4806.ipc import protocol
+from eml4806.robot.fleet import RobotFleet
+
+##############################################################################################
+
+class SimulationServer:
+    """
+    Steps robots on a fixed clock and serves them over local TCP or a Unix socket.
+
+    Hosts either a list of robots (anything with move(vl, vr, dt) and an odometer, e.g. Robot)
+    or a RobotFleet, which is stepped in one batched call. Clients send wheel commands that are
+    applied from the next tick on and may subscribe to binary pose telemetry. Telemetry is
+    encoded once per tick and queued to every subscriber without awaiting; clients whose send
+    buffer is over the high-water mark skip frames, so slow clients never stall the physics.
+    Clients sending malformed frames are disconnected.
+
+    A RobotFleet may gain or lose robots between ticks; commands follow the robot ids. A list
+    of robots must keep its size.
+    """
+
+    def __init__(self, robots, dt=0.1, realtime=True, high_water=1 << 20):
+        self.robots = robots
+        self.dt = float(dt)
+        self.realtime = realtime
+        self.high_water = int(high_water)
+        self.tick = 0
+        self.time = 0.0
+        self._fleet = isinstance(robots, RobotFleet)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._vl = np.zeros(0)
+        self._vr = np.zeros(0)
+        self._resize(robots.ids() if self._fleet else np.arange(len(robots)))
+        self._clients = {}
+        self._server = None
+        self._task = None
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._serve, path=path)
+        else:
+            self._server = await asyncio.start_server(self._serve, host, port)
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def address(self):
+        return self._server.sockets[0].getsockname()
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._server.close()
+        await self._server.wait_closed()
+        for writer in list(self._clients):
+            writer.close()
+
+    ##########################################################################################
+    # Physics
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        while True:
+            self.step()
+            if self.realtime:
+                # Fixed clock, late ticks are not made up with bursts
+                delay = start + self.tick * self.dt - loop.time()
+                if delay < -self.dt:
+                    start = loop.time() - self.tick * self.dt
+                await asyncio.sleep(max(delay, 0.0))
+            else:
+                await asyncio.sleep(0)
+
+    def _resize(self, ids):
+        # Per-robot buffers for the given ids, keeping the commands of the robots still present
+        k = np.minimum(np.searchsorted(self._ids, ids), max(len(self._ids) - 1, 0))
+        kept = (self._ids[k] == ids) if len(self._ids) else np.zeros(len(ids), dtype=bool)
+        vl, vr = np.zeros(len(ids)), np.zeros(len(ids))
+        vl[kept] = self._vl[k[kept]]
+        vr[kept] = self._vr[k[kept]]
+        self._ids, self._vl, self._vr = ids, vl, vr
+        self._records = np.zeros(len(ids), dtype=protocol.RECORD)
+        self._records["id"] = ids
+
+    def step(self):
+        if self._fleet:
+            # Ids only grow, so the same size and last id mean the same robots
+            ids = self.robots.ids()
+            if len(ids) != len(self._ids) or (len(ids) and ids[-1] != self._ids[-1]):
+                self._resize(ids)
+            self.robots.move(self._vl, self._vr, self.dt)
+            self._records["x"] = self.robots.x
+            self._records["y"] = self.robots.y
+            self._records["theta"] = self.robots.theta
+        else:
+            if len(self.robots) != len(self._ids):
+                raise ValueError("Robots were added or removed, host a RobotFleet to change them at run time.")
+            for k, robot in enumerate(self.robots):
+                robot.move(self._vl[k], self._vr[k], self.dt)
+                self._records[k]["x"], self._records[k]["y"], self._records[k]["theta"] = robot.odometer.pose()
+        self._records["vl"] = self._vl
+        self._records["vr"] = self._vr
+        self.tick += 1
+        self.time += self.dt
+        self._publish()
+
+    def _publish(self):
+        frame = None
+        for writer, every in self._clients.items():
+            if not every or self.tick % every:
+                continue
+            if writer.transport.get_write_buffer_size() > self.high_water:
+                continue
+            if frame is None:
+                frame = protocol.telemetry(self.tick, self.time, self._records)
+            writer.write(frame)
+
+    ##########################################################################################
+    # Clients
+
+    async def _serve(self, reader, writer):
+        self._clients[writer] = 0
+        try:
+            while True:
+                kind, payload = await protocol.read(reader)
+                if kind == protocol.COMMAND:
+                    id, vl, vr = protocol.parseCommand(payload)
+                    k = np.searchsorted(self._ids, id)
+                    if k < len(self._ids) and self._ids[k] == id:
+                        self._vl[k] = vl
+                        self._vr[k] = vr
+                elif kind == protocol.SUBSCRIBE:
+                    self._clients[writer] = protocol.parseSubscribe(payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except (struct.error, ValueError):
+            # Malformed or oversized frame, drop the client without taking the server down
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+##############################################################################################
+
+class SimulationClient:
+    """
+    Connection to a SimulationServer.
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=None, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def command(self, id, vl, vr):
+        self._writer.write(protocol.command(id, vl, vr))
+        await self._writer.drain()
+
+    async def subscribe(self, every=1):
+        self._writer.write(protocol.subscribe(every))
+        await self._writer.drain()
+
+    async def telemetry(self):
+        """
+        Next telemetry frame as (tick, time, records).
+        """
+        while True:
+            kind, payload = await protocol.read(self._reader)
+            if kind == protocol.TELEMETRY:
+                return protocol.parseTelemetry(payload)
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
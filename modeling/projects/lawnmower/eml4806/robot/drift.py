@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+import numpy as np
+
+from eml4806.geometry.angle import normalize
+
+##############################################################################################
+
+@dataclass
+class OdometryNoise:
+    slip       : float = 0.0 # Std of the fractional wheel slip, drawn per wheel and step
+    track_width: float = 0.0 # Std of the fractional effective track-width error, drawn per run
+    encoder    : float = 0.0 # Std of the additive wheel-speed encoder noise (m/s), per wheel and step
+
+##############################################################################################
+
+@dataclass
+class DriftStatistics:
+    time      : np.ndarray # (K,) s
+    mean      : np.ndarray # (K, 3) mean pose error (x, y, theta)
+    covariance: np.ndarray # (K, 3, 3) pose error covariance
+    runs      : int = 0
+
+##############################################################################################
+
+class Welford:
+    """
+    Streaming mean and covariance of K independent 3-D quantities.
+    Batches of samples shaped (B, K, 3), or (B, 3) for a single row k, are merged with
+    Chan's parallel update, so memory does not depend on how many samples have been seen.
+    Every row keeps its own sample count.
+    """
+
+    def __init__(self, size, dim=3):
+        self.count = np.zeros(size, dtype=np.int64)
+        self.mean = np.zeros((size, dim), dtype=float)
+        self._m2 = np.zeros((size, dim, dim), dtype=float)
+
+    def update(self, samples, row=None):
+        s = np.asarray(samples, dtype=float)
+        if row is None:
+            rows = slice(None)
+        else:
+            rows = slice(row, row + 1)
+            s = s[:, None, :]
+        nb = s.shape[0]
+        if nb == 0:
+            return
+        mb = s.mean(axis=0)
+        d = s - mb
+        m2b = np.einsum("bki,bkj->kij", d, d)
+        na = self.count[rows]
+        n = na + nb
+        delta = mb - self.mean[rows]
+        self.mean[rows] += delta * (nb / n)[:, None]
+        self._m2[rows] += m2b + np.einsum("ki,kj->kij", delta, delta) * (na * nb / n)[:, None, None]
+        self.count[rows] = n
+
+    def covariance(self):
+        n = self.count[:, None, None]
+        return np.where(n >= 2, self._m2 / np.maximum(n - 1, 1), 0.0)
+
+##############################################################################################
+
+def drift(commands, dt, odometer, noise, runs=1000, batch=256, seed=0, every=1, block=1024, pose=(0.0, 0.0, 0.0)):
+    """
+    Monte Carlo estimate of the dead-reckoning drift along a commanded trajectory.
+
+    commands is a (T, 2) array of commanded (vl, vr) wheel speeds applied for dt each.
+    For every run the dead-reckoned pose integrates the encoder readings (command plus
+    encoder noise) with the nominal track width of the odometer, while the true pose
+    integrates the slipping wheel speeds with the run's perturbed track width.
+    Runs are simulated in batches as (B,) arrays, each run drawing from its own RNG stream
+    spawned from seed, so results do not depend on the batch size.
+
+    Returns the mean and covariance of the pose error (true minus dead-reckoned) every
+    `every` steps. Each sampled (B, 3) error block is merged into the statistics as soon as
+    it is computed, so memory depends on neither the batch count nor the trajectory length.
+    """
+    u = np.asarray(commands, dtype=float).reshape(-1, 2)
+    T = len(u)
+    scheme = type(odometer)
+    b = odometer.track_width
+    vmax = np.inf if odometer.maximum_linear_velocity is None else odometer.maximum_linear_velocity
+    wmax = np.inf if odometer.maximum_angular_velocity is None else odometer.maximum_angular_velocity
+
+    samples = np.arange(every, T + 1, every)
+    stats = Welford(len(samples))
+    streams = np.random.SeedSequence(seed).spawn(runs)
+
+    for start in range(0, runs, batch):
+        rngs = [np.random.default_rng(s) for s in streams[start:start + batch]]
+        B = len(rngs)
+        # Per-run track width of the real robot
+        tw = b * (1.0 + noise.track_width * np.array([rng.standard_normal() for rng in rngs]))
+        x0, y0, a0 = pose
+        # True and dead-reckoned poses
+        xt = np.full(B, x0); yt = np.full(B, y0); at = np.full(B, a0)
+        xe = np.full(B, x0); ye = np.full(B, y0); ae = np.full(B, a0)
+        error = np.empty((B, 3), dtype=float)
+        k = 0
+        for t0 in range(0, T, block):
+            L = min(block, T - t0)
+            # Per-step slip (left, right) and encoder noise (left, right) of every run
+            e = np.stack([rng.standard_normal((L, 4)) for rng in rngs], axis=1)
+            for i in range(L):
+                t = t0 + i
+                vl, vr = u[t]
+                slip = noise.slip * e[i, :, 0:2]
+                v, w = scheme.kinematics(vl * (1.0 - slip[:, 0]), vr * (1.0 - slip[:, 1]), tw, vmax, wmax)
+                xt, yt, at = scheme.step(xt, yt, at, v, w, dt)
+                enc = noise.encoder * e[i, :, 2:4]
+                v, w = scheme.kinematics(vl + enc[:, 0], vr + enc[:, 1], b, vmax, wmax)
+                xe, ye, ae = scheme.step(xe, ye, ae, v, w, dt)
+                if (t + 1) % every == 0:
+                    error[:, 0] = xt - xe
+                    error[:, 1] = yt - ye
+                    error[:, 2] = normalize(at - ae)
+                    stats.update(error, k)
+                    k += 1
+
+    runs = int(stats.count.min()) if len(samples) else 0
+    return DriftStatistics(time=samples * dt, mean=stats.mean, covariance=stats.covariance(), runs=runs)
@@ -0,0 +1,70 @@
+import numpy as np
+
+##############################################################################################
+
+class Drivetrain:
+    """
+    Left/right motor dynamics of N skid-steer robots.
+
+    Each wheel follows a first-order lag towards its commanded angular velocity
+        tau * dw/dt = -w + u
+    discretized exactly as the linear state-space update
+        w[k+1] = A w[k] + B u[k],   A = exp(-dt/tau),  B = 1 - A
+    The wheels are decoupled, so A and B are stored as (N,) diagonals and cached per dt.
+    Commands are clipped to the motor speed limit and the change per step is rate limited by
+    the motor acceleration and torque limits. Speeds in and out are wheel linear speeds (m/s).
+    """
+
+    def __init__(self, motors, wheels):
+        motors = np.atleast_1d(motors)
+        wheels = np.broadcast_to(np.atleast_1d(wheels), motors.shape)
+        self.count = len(motors)
+        self.radius = np.array([0.5 * w.diameter for w in wheels], dtype=float)
+        self.maximum_angular_velocity = np.array([m.maximum_angular_velocity for m in motors], dtype=float)
+        self.time_constant = np.array([m.time_constant for m in motors], dtype=float)
+        # Acceleration limit, the tighter of the motor rating and torque over inertia
+        acceleration = np.array([m.maximum_angular_acceleration for m in motors], dtype=float)
+        torque = np.array([m.maximum_torque for m in motors], dtype=float)
+        inertia = np.array([m.inertia for m in motors], dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            torque = np.where(inertia > 0.0, torque / inertia, np.inf)
+        self.maximum_angular_acceleration = np.minimum(acceleration, torque)
+        # State, wheel angular velocities (rad/s) (left, right)
+        self.state = np.zeros((self.count, 2), dtype=float)
+        self._matrices = {}
+
+    def reset(self, vl=0.0, vr=0.0):
+        self.state[:, 0] = np.asarray(vl, dtype=float) / self.radius
+        self.state[:, 1] = np.asarray(vr, dtype=float) / self.radius
+
+    def velocities(self):
+        return self.state[:, 0] * self.radius, self.state[:, 1] * self.radius
+
+    def matrices(self, dt):
+        # Discretization is done once per distinct dt
+        AB = self._matrices.get(dt)
+        if AB is None:
+            with np.errstate(divide="ignore"):
+                A = np.where(self.time_constant > 0.0, np.exp(-dt / self.time_constant), 0.0)
+            AB = (A[:, None], (1.0 - A)[:, None])
+            self._matrices[dt] = AB
+        return AB
+
+    def step(self, vl, vr, dt):
+        single = np.ndim(vl) == 0 and np.ndim(vr) == 0 and self.count == 1
+        u = np.empty_like(self.state)
+        u[:, 0] = vl
+        u[:, 1] = vr
+        u /= self.radius[:, None]
+        # Motor speed limits
+        wmax = self.maximum_angular_velocity[:, None]
+        np.clip(u, -wmax, wmax, out=u)
+        A, B = self.matrices(dt)
+        w = A * self.state + B * u
+        # Acceleration (torque) limits
+        dw = self.maximum_angular_acceleration[:, None] * dt
+        self.state += np.clip(w - self.state, -dw, dw)
+        vl, vr = self.velocities()
+        if single:
+            return float(vl[0]), float(vr[0])
+        return vl, vr
@@ -0,0 +1,102 @@
+import numpy as np
+
+from eml4806.geometry.angle import normalize
+
+##############################################################################################
+
+class EKF:
+    """
+    Extended Kalman filter of the poses of N skid-steer robots at once.
+
+    The mean is an (N, 3) array of (x, y, theta) and the covariance an (N, 3, 3) array.
+    predict() propagates them through the kinematics/step/jacobians kernels of an odometer
+    class from the commanded (or encoder) wheel speeds, whose noise is the process noise:
+        std(vl) = wheel_noise + slip*|vl|, and likewise for vr.
+    A linear or angular velocity clipped at its maximum injects no noise.
+    update() fuses GPS position fixes with noise std gps_noise (m). Both steps are batched
+    over the robots with einsum and np.linalg, without per-robot Python code.
+    """
+
+    def __init__(self, odometer, poses, track_width, maximum_linear_velocity=np.inf, maximum_angular_velocity=np.inf,
+                 covariance=0.0, wheel_noise=0.01, slip=0.05, gps_noise=0.02):
+        self.odometer = odometer
+        self.mean = np.array(poses, dtype=float).reshape(-1, 3)
+        n = len(self.mean)
+        self.count = n
+        self.track_width = self._column(track_width)
+        self.maximum_linear_velocity = self._column(maximum_linear_velocity)
+        self.maximum_angular_velocity = self._column(maximum_angular_velocity)
+        c = np.asarray(covariance, dtype=float)
+        if c.ndim < 2:
+            c = np.eye(3) * c # Scalar or diagonal
+        self.covariance = np.array(np.broadcast_to(c, (n, 3, 3)))
+        self.wheel_noise = float(wheel_noise)
+        self.slip = float(slip)
+        self.gps_noise = float(gps_noise)
+
+    @classmethod
+    def fromOdometer(cls, odometer, poses, **options):
+        return cls(type(odometer), poses, odometer.track_width, _limit(odometer.maximum_linear_velocity),
+                   _limit(odometer.maximum_angular_velocity), **options)
+
+    @classmethod
+    def fromFleet(cls, fleet, **options):
+        return cls(fleet.odometer, fleet.poses(), fleet.track_width, fleet.maximum_linear_velocity,
+                   fleet.maximum_angular_velocity, **options)
+
+    def poses(self):
+        return self.mean.copy()
+
+    def predict(self, vl, vr, dt, tol=1e-3):
+        n = self.count
+        vl = np.broadcast_to(np.asarray(vl, dtype=float), (n,))
+        vr = np.broadcast_to(np.asarray(vr, dtype=float), (n,))
+        scheme = self.odometer
+        x, y, theta = self.mean.T
+        v, w = scheme.kinematics(vl, vr, self.track_width, self.maximum_linear_velocity, self.maximum_angular_velocity)
+        F, G = scheme.jacobians(x, y, theta, v, w, dt, tol)
+        # A saturated input does not move with the wheel speeds, so it carries no wheel noise
+        b = self.track_width
+        G[np.abs(0.5 * (vr + vl)) > self.maximum_linear_velocity, :, 0] = 0.0
+        G[np.abs((vr - vl) / b) > self.maximum_angular_velocity, :, 1] = 0.0
+        # Wheel speeds to (v, w), then to the pose
+        J = np.zeros((n, 2, 2))
+        J[:, 0, 0] = J[:, 0, 1] = 0.5
+        J[:, 1, 0] = -1.0 / b
+        J[:, 1, 1] = 1.0 / b
+        L = G @ J
+        sl = self.wheel_noise + self.slip * np.abs(vl)
+        sr = self.wheel_noise + self.slip * np.abs(vr)
+        # L diag(sl^2, sr^2) L^T
+        Q = np.einsum("nik,nk,njk->nij", L, np.column_stack((sl*sl, sr*sr)), L)
+        self.covariance = F @ self.covariance @ F.transpose(0, 2, 1) + Q
+        x, y, theta = scheme.step(x, y, theta, v, w, dt, tol)
+        self.mean[:, 0] = x
+        self.mean[:, 1] = y
+        self.mean[:, 2] = theta
+
+    def update(self, fixes, rows=None, noise=None):
+        """
+        Fuse (M, 2) GPS fixes of the robots in rows (all robots when None).
+        """
+        rows = slice(None) if rows is None else np.asarray(rows)
+        z = np.asarray(fixes, dtype=float).reshape(-1, 2)
+        r = self.gps_noise if noise is None else float(noise)
+        P = self.covariance[rows]
+        # H = [I 0] picks the position, so H P = P[:, :2, :] and S = P[:, :2, :2] + R
+        HP = P[:, :2, :]
+        S = HP[:, :, :2] + (r * r) * np.eye(2)
+        K = np.linalg.solve(S, HP).transpose(0, 2, 1)      # (M, 3, 2), S is symmetric
+        innovation = z - self.mean[rows, :2]
+        mean = self.mean[rows] + np.einsum("nij,nj->ni", K, innovation)
+        mean[:, 2] = normalize(mean[:, 2])
+        P = P - K @ HP
+        self.mean[rows] = mean
+        self.covariance[rows] = 0.5 * (P + P.transpose(0, 2, 1))
+
+    def _column(self, value):
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.count,)).copy()
+
+def _limit(value):
+    # Unset odometer limits mean unlimited
+    return np.inf if value is None else float(value)
@@ -0,0 +1,269 @@
+import numpy as np
+
+from eml4806.robot.odometry import AnalyticalSkidDriveOdometer
+from eml4806.robot.skidsteer import Chassis, Wheel, Motor, Blade
+
+##############################################################################################
+
+# Struct-of-arrays storage: one aligned column per parameter or state variable
+_COLUMNS = {
+    # Chassis
+    "length"                  : float,
+    "width"                   : float,
+    "wheelbase"               : float,
+    "trackwidth"              : float,
+    # Wheels
+    "wheel_diameter"          : float,
+    "wheel_width"             : float,
+    # Motors
+    "motor_angular_velocity"  : float,
+    "motor_time_constant"     : float,
+    "motor_torque"            : float,
+    "motor_inertia"           : float,
+    "motor_acceleration"      : float,
+    # Blade
+    "blade_diameter"          : float,
+    "blade_on"                : bool,
+    "blade_height"            : float,
+    # Odometer
+    "track_width"             : float,
+    "maximum_linear_velocity" : float,
+    "maximum_angular_velocity": float,
+    # State
+    "x"                       : float,
+    "y"                       : float,
+    "theta"                   : float,
+    "vl"                      : float,
+    "vr"                      : float,
+}
+
+##############################################################################################
+
+class RobotFleet:
+    """
+    Many skid-steer robots stored as aligned NumPy columns.
+
+    Robots are added from the same Chassis/Wheel/Motor/Blade/odometer specs used by Robot and
+    are identified by a stable id. Rows stay in insertion order, so the id column is sorted and
+    ids are resolved with a binary search. All robots share the integration scheme of the
+    odometer class given to the fleet.
+    """
+
+    def __init__(self, odometer=AnalyticalSkidDriveOdometer, capacity=16):
+        self.odometer = odometer
+        self._size = 0
+        self._next = 0
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._columns = {name: np.zeros(0, dtype=kind) for name, kind in _COLUMNS.items()}
+        self._reserve(max(1, int(capacity)))
+
+    def __len__(self):
+        return self._size
+
+    def __getattr__(self, name):
+        # Column views, e.g. fleet.x or fleet.blade_on
+        columns = self.__dict__.get("_columns")
+        if columns is not None and name in columns:
+            return columns[name][:self._size]
+        raise AttributeError(name)
+
+    def __getitem__(self, id):
+        return FleetRobot(self, id)
+
+    def __iter__(self):
+        for id in self.ids():
+            yield FleetRobot(self, int(id))
+
+    def ids(self):
+        return self._ids[:self._size].copy()
+
+    def row(self, id):
+        ids = self._ids[:self._size]
+        k = int(np.searchsorted(ids, id))
+        if k == self._size or ids[k] != id:
+            raise KeyError(f"Robot {id} is not part of the fleet.")
+        return k
+
+    def add(self, x, y, theta, chassis, wheels, motors, blade, odometer):
+        if not isinstance(odometer, self.odometer):
+            raise ValueError(f"Fleet integrates with {self.odometer.__name__}, got {type(odometer).__name__}.")
+        self._reserve(self._size + 1)
+        k = self._size
+        values = {
+            "length": chassis.length,
+            "width": chassis.width,
+            "wheelbase": chassis.wheelbase,
+            "trackwidth": chassis.trackwidth,
+            "wheel_diameter": wheels.diameter,
+            "wheel_width": wheels.width,
+            "motor_angular_velocity": motors.maximum_angular_velocity,
+            "motor_time_constant": motors.time_constant,
+            "motor_torque": motors.maximum_torque,
+            "motor_inertia": motors.inertia,
+            "motor_acceleration": motors.maximum_angular_acceleration,
+            "blade_diameter": blade.diameter,
+            "blade_on": blade.on,
+            "blade_height": blade.height,
+            "track_width": odometer.track_width,
+            "maximum_linear_velocity": _limit(odometer.maximum_linear_velocity),
+            "maximum_angular_velocity": _limit(odometer.maximum_angular_velocity),
+            "x": x,
+            "y": y,
+            "theta": theta,
+            "vl": 0.0,
+            "vr": 0.0,
+        }
+        for name, value in values.items():
+            self._columns[name][k] = value
+        self._ids[k] = id = self._next
+        self._next += 1
+        self._size += 1
+        return id
+
+    def remove(self, ids):
+        # Compact the remaining rows in a single pass, preserving their order
+        n = self._size
+        keep = ~np.isin(self._ids[:n], np.atleast_1d(ids))
+        m = int(keep.sum())
+        self._ids[:m] = self._ids[:n][keep]
+        for column in self._columns.values():
+            column[:m] = column[:n][keep]
+        self._size = m
+
+    def gps(self):
+        return np.column_stack((self.x, self.y))
+
+    def poses(self):
+        return np.column_stack((self.x, self.y, self.theta))
+
+    # Control wheel speeds (m/s) of every robot, vl and vr are (N,) arrays or scalars
+    def move(self, vl, vr, dt, tol=1e-3):
+        n = self._size
+        c = self._columns
+        vl = np.broadcast_to(np.asarray(vl, dtype=float), (n,))
+        vr = np.broadcast_to(np.asarray(vr, dtype=float), (n,))
+        c["vl"][:n] = vl
+        c["vr"][:n] = vr
+        v, w = self.odometer.kinematics(vl, vr, c["track_width"][:n],
+                                        c["maximum_linear_velocity"][:n], c["maximum_angular_velocity"][:n])
+        x, y, theta = self.odometer.step(c["x"][:n], c["y"][:n], c["theta"][:n], v, w, dt, tol)
+        c["x"][:n] = x
+        c["y"][:n] = y
+        c["theta"][:n] = theta
+
+    def nbytes(self):
+        return self._ids.nbytes + sum(column.nbytes for column in self._columns.values())
+
+    def _reserve(self, n):
+        if n <= len(self._ids):
+            return
+        capacity = max(n, 2 * len(self._ids))
+        self._ids = _grow(self._ids, capacity)
+        for name, column in self._columns.items():
+            self._columns[name] = _grow(column, capacity)
+
+##############################################################################################
+
+class FleetRobot:
+    """
+    A single robot of a fleet, exposing the Robot interface over the fleet columns.
+    The specs returned by chassis/wheels/motors/blade are copies.
+    """
+
+    def __init__(self, fleet, id):
+        fleet.row(id)
+        self.fleet = fleet
+        self.id = id
+        self.odometer = FleetOdometer(fleet, id)
+
+    def _get(self, name):
+        return self.fleet._columns[name][self.fleet.row(self.id)]
+
+    @property
+    def chassis(self):
+        return Chassis(float(self._get("length")), float(self._get("width")),
+                       float(self._get("wheelbase")), float(self._get("trackwidth")))
+
+    @property
+    def wheels(self):
+        return Wheel(float(self._get("wheel_diameter")), float(self._get("wheel_width")))
+
+    @property
+    def motors(self):
+        return Motor(float(self._get("motor_angular_velocity")), float(self._get("motor_time_constant")),
+                     float(self._get("motor_torque")), float(self._get("motor_inertia")),
+                     float(self._get("motor_acceleration")))
+
+    @property
+    def blade(self):
+        return Blade(float(self._get("blade_diameter")), bool(self._get("blade_on")),
+                     float(self._get("blade_height")))
+
+    def setBlade(self, on):
+        self.fleet._columns["blade_on"][self.fleet.row(self.id)] = bool(on)
+
+    def gps(self):
+        return self.odometer.position()
+
+    # Control wheel shaft rotation (m/s) of this robot only
+    def move(self, vl, vr, dt, tol=1e-3):
+        fleet = self.fleet
+        k = fleet.row(self.id)
+        c = fleet._columns
+        c["vl"][k] = vl
+        c["vr"][k] = vr
+        v, w = fleet.odometer.kinematics(vl, vr, c["track_width"][k],
+                                         c["maximum_linear_velocity"][k], c["maximum_angular_velocity"][k])
+        x, y, theta = fleet.odometer.step(c["x"][k], c["y"][k], c["theta"][k], v, w, dt, tol)
+        c["x"][k] = x
+        c["y"][k] = y
+        c["theta"][k] = theta
+
+##############################################################################################
+
+class FleetOdometer:
+    """
+    Read access to the odometry state of a fleet robot, mirroring SkidDriveOdometer.
+    """
+
+    def __init__(self, fleet, id):
+        self.fleet = fleet
+        self.id = id
+
+    def _get(self, name):
+        return float(self.fleet._columns[name][self.fleet.row(self.id)])
+
+    @property
+    def track_width(self):
+        return self._get("track_width")
+
+    @property
+    def maximum_linear_velocity(self):
+        return self._get("maximum_linear_velocity")
+
+    @property
+    def maximum_angular_velocity(self):
+        return self._get("maximum_angular_velocity")
+
+    def position(self):
+        return self._get("x"), self._get("y")
+
+    def orientation(self):
+        return self._get("theta")
+
+    def pose(self):
+        return self._get("x"), self._get("y"), self._get("theta")
+
+    def velocities(self):
+        return self._get("vr"), self._get("vl")
+
+##############################################################################################
+
+def _limit(value):
+    # Unset odometer limits mean unlimited
+    return np.inf if value is None else float(value)
+
+def _grow(array, capacity):
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
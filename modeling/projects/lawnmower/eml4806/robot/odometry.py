@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+import numpy as np
 from numpy import pi, sin, cos, clip
 from eml4806.geometry.angle import normalize
 
@@ -30,6 +31,14 @@ class SkidDriveOdometer(ABC):
     def velocities(self):
         return self._vr, self._vl
 
+    def state(self):
+        return self._x, self._y, self._theta, self._vl, self._vr
+
+    def setState(self, x, y, theta, vl=0.0, vr=0.0):
+        self.initilize(x, y, theta)
+        self._vl = vl
+        self._vr = vr
+
     def integrate(self, vl, vr, dt, tol=1e-3):
         # Remember
         self._vl = vl
@@ -46,6 +55,42 @@ class SkidDriveOdometer(ABC):
     @abstractmethod
     def _integrate(self, v, w, dt, tol): ...
 
+    # Vectorized counterparts of integrate/_integrate over arrays of robots
+
+    @staticmethod
+    def kinematics(vl, vr, track_width, maximum_linear_velocity=np.inf, maximum_angular_velocity=np.inf):
+        v = 0.5 * (vr + vl)
+        w = (vr - vl) / track_width
+        v = np.clip(v, -maximum_linear_velocity, maximum_linear_velocity)
+        w = np.clip(w, -maximum_angular_velocity, maximum_angular_velocity)
+        return v, w
+
+    @staticmethod
+    @abstractmethod
+    def step(x, y, theta, v, w, dt, tol=1e-3): ...
+
+    # Jacobians of step() for linearized filters (see eml4806.robot.ekf), shaped (N, 3, 3)
+    # with respect to the pose and (N, 3, 2) with respect to (v, w)
+    @staticmethod
+    @abstractmethod
+    def jacobians(x, y, theta, v, w, dt, tol=1e-3): ...
+
+def _jacobians(theta, a, ds, dt, dx_dw, dy_dw):
+    # Shared layout of the motion Jacobians, a being the heading the displacement follows
+    n = np.size(theta)
+    F = np.zeros((n, 3, 3))
+    G = np.zeros((n, 3, 2))
+    c, s = np.cos(a), np.sin(a)
+    F[:, 0, 0] = F[:, 1, 1] = F[:, 2, 2] = 1.0
+    F[:, 0, 2] = -ds * s
+    F[:, 1, 2] = ds * c
+    G[:, 0, 0] = dt * c
+    G[:, 1, 0] = dt * s
+    G[:, 0, 1] = dx_dw
+    G[:, 1, 1] = dy_dw
+    G[:, 2, 1] = dt
+    return F, G
+
 ##############################################################################################
 
 @dataclass
@@ -58,6 +103,17 @@ class FirstOrderSkidDriveOdometer(SkidDriveOdometer):
         self._y += ds*sin(self._theta)
         self._theta += da
 
+    @staticmethod
+    def step(x, y, theta, v, w, dt, tol=1e-3):
+        ds = v*dt
+        da = w*dt
+        return x + ds*np.cos(theta), y + ds*np.sin(theta), theta + da
+
+    @staticmethod
+    def jacobians(x, y, theta, v, w, dt, tol=1e-3):
+        theta, v = np.broadcast_arrays(np.asarray(theta, dtype=float).ravel(), np.asarray(v, dtype=float).ravel())
+        return _jacobians(theta, theta, v*dt, dt, 0.0, 0.0)
+
 ##############################################################################################
 
 @dataclass
@@ -70,6 +126,21 @@ class SecondOrderSkidDriveOdometer(SkidDriveOdometer):
         self._x += ds * cos(a)
         self._y += ds * sin(a)
         self._theta += da
+
+    @staticmethod
+    def step(x, y, theta, v, w, dt, tol=1e-3):
+        ds = v*dt
+        da = w*dt
+        a = theta + 0.5*da
+        return x + ds*np.cos(a), y + ds*np.sin(a), theta + da
+
+    @staticmethod
+    def jacobians(x, y, theta, v, w, dt, tol=1e-3):
+        theta, v, w = np.broadcast_arrays(*(np.asarray(a, dtype=float).ravel() for a in (theta, v, w)))
+        ds = v*dt
+        a = theta + 0.5*w*dt
+        # The midpoint heading moves with w by dt/2
+        return _jacobians(theta, a, ds, dt, -0.5*dt*ds*np.sin(a), 0.5*dt*ds*np.cos(a))
         
 ##############################################################################################
 
@@ -92,3 +163,166 @@ class AnalyticalSkidDriveOdometer(SkidDriveOdometer):
             self._x += r * (sin(a) - sin(self._theta))
             self._y -= r * (cos(a) - cos(self._theta))
             self._theta += da
+
+    @staticmethod
+    def step(x, y, theta, v, w, dt, tol=1e-3):
+        ds = v*dt
+        da = w*dt
+        straight = np.abs(da) < tol
+        # Midpoint update where the arc degenerates into a line
+        a = theta + 0.5*da
+        xs = x + ds*np.cos(a)
+        ys = y + ds*np.sin(a)
+        # Arc update elsewhere
+        r = ds / np.where(straight, 1.0, da)
+        a = theta + da
+        xa = x + r*(np.sin(a) - np.sin(theta))
+        ya = y - r*(np.cos(a) - np.cos(theta))
+        return np.where(straight, xs, xa), np.where(straight, ys, ya), theta + da
+
+    @staticmethod
+    def jacobians(x, y, theta, v, w, dt, tol=1e-3):
+        theta, v, w = np.broadcast_arrays(*(np.asarray(a, dtype=float).ravel() for a in (theta, v, w)))
+        # Straight steps linearize as the midpoint update
+        F, G = SecondOrderSkidDriveOdometer.jacobians(x, y, theta, v, w, dt)
+        da = w*dt
+        arc = np.abs(da) >= tol
+        if not arc.any():
+            return F, G
+        t, v, w = theta[arc], v[arc], w[arc]
+        a = t + da[arc]
+        ds, dc = np.sin(a) - np.sin(t), np.cos(a) - np.cos(t)
+        r = v / w
+        F[arc, 0, 2] = r*dc
+        F[arc, 1, 2] = r*ds
+        G[arc, 0, 0] = ds / w
+        G[arc, 1, 0] = -dc / w
+        G[arc, 0, 1] = -r/w*ds + r*np.cos(a)*dt
+        G[arc, 1, 1] = r/w*dc + r*np.sin(a)*dt
+        return F, G
+
+    @staticmethod
+    def trajectory(x, y, theta, v, w, dt, steps, tol=1e-3):
+        """
+        Closed-form poses after each of K steps of a constant (v, w) command, shaped (K, ...)
+        over the broadcast shape of the inputs. Matches K successive step() calls.
+        """
+        x, y, theta, v, w = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, y, theta, v, w)))
+        k = np.arange(1, int(steps) + 1, dtype=float).reshape((-1,) + (1,)*theta.ndim)
+        ds = v*dt
+        da = w*dt
+        straight = np.abs(da) < tol
+        heading = theta + k*da
+        # Chained midpoint updates sum cos/sin(theta + (j + 1/2) da) over j < k, which is
+        # sin(k da/2) / sin(da/2) times cos/sin of the mean heading theta + k da/2
+        half = np.sin(0.5*da)
+        scale = np.where(half != 0.0, np.sin(0.5*k*da) / np.where(half != 0.0, half, 1.0), k)
+        mean = theta + 0.5*k*da
+        xs = x + ds*scale*np.cos(mean)
+        ys = y + ds*scale*np.sin(mean)
+        # Chained arcs telescope into a single arc
+        r = ds / np.where(straight, 1.0, da)
+        xa = x + r*(np.sin(heading) - np.sin(theta))
+        ya = y - r*(np.cos(heading) - np.cos(theta))
+        return np.where(straight, xs, xa), np.where(straight, ys, ya), heading
+
+    # Advance K steps of constant wheel speeds at once, returns the (K, 3) poses
+    def fastForward(self, vl, vr, dt, steps, tol=1e-3):
+        self._vl = vl
+        self._vr = vr
+        vmax = np.inf if self.maximum_linear_velocity is None else self.maximum_linear_velocity
+        wmax = np.inf if self.maximum_angular_velocity is None else self.maximum_angular_velocity
+        v, w = self.kinematics(vl, vr, self.track_width, vmax, wmax)
+        x, y, theta = self.trajectory(self._x, self._y, self._theta, v, w, dt, steps, tol)
+        poses = np.column_stack((x, y, theta))
+        if len(poses):
+            self._x, self._y, self._theta = (float(a) for a in poses[-1])
+        return poses
+
+##############################################################################################
+
+# Dormand-Prince 5(4) tableau
+_DP_C = (0.0, 1/5, 3/10, 4/5, 8/9, 1.0, 1.0)
+_DP_A = (
+    (),
+    (1/5,),
+    (3/40, 9/40),
+    (44/45, -56/15, 32/9),
+    (19372/6561, -25360/2187, 64448/6561, -212/729),
+    (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+    (35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84),
+)
+_DP_E = (71/57600, 0.0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40)
+
+def dormand_prince(f, y, dt, tol=1e-6, h=None, max_steps=10000):
+    """
+    Integrate y' = f(t, y) over [0, dt] with adaptive Dormand-Prince 5(4) substeps.
+    The embedded 4th-order solution estimates the local error, which is kept below
+    tol*(1 + |y|) componentwise (the max over all components of batched states).
+    Returns the final state, the suggested next substep and the number of evaluations of f.
+    """
+    y = np.asarray(y, dtype=float)
+    h = dt if h is None else min(abs(h), dt)
+    t = 0.0
+    k1 = f(t, y)
+    evaluations = 1
+    steps = 0
+    while dt - t > 1e-12 * dt:
+        if steps == max_steps:
+            raise RuntimeError("Adaptive integration did not converge, reduce the step or relax the tolerance.")
+        steps += 1
+        h = min(h, dt - t)
+        k = [k1]
+        for c, a in zip(_DP_C[1:], _DP_A[1:]):
+            yi = y + h * sum(aj * kj for aj, kj in zip(a, k) if aj != 0.0)
+            k.append(f(t + c * h, yi))
+        evaluations += 6
+        # The last stage is evaluated at the 5th-order solution (first-same-as-last)
+        y5 = yi
+        err = h * sum(e * kj for e, kj in zip(_DP_E, k) if e != 0.0)
+        ratio = np.max(np.abs(err) / (tol * (1.0 + np.abs(y5))))
+        if ratio <= 1.0:
+            t += h
+            y = y5
+            k1 = k[-1]
+        # Step-size controller with safety factor and bounded growth
+        h *= min(5.0, max(0.2, 0.9 * ratio ** -0.2)) if ratio > 0.0 else 5.0
+    return y, h, evaluations
+
+def _unicycle(state, v, w):
+    theta = state[2]
+    return np.stack(np.broadcast_arrays(v * np.cos(theta), v * np.sin(theta), w))
+
+##############################################################################################
+
+@dataclass
+class AdaptiveSkidDriveOdometer(SkidDriveOdometer):
+    error_tolerance: float = 1e-6 # Local error tolerance of the adaptive substeps
+
+    def initilize(self, x, y, theta):
+        super().initilize(x, y, theta)
+        self._h = None
+        self.evaluations = 0
+
+    # Right-hand side of the pose ODE, override to add wheel dynamics or slip
+    def derivative(self, t, state, v, w):
+        return _unicycle(state, v, w)
+
+    def _integrate(self, v, w, dt, tol):
+        state = np.array([self._x, self._y, self._theta])
+        f = lambda t, s: self.derivative(t, s, v, w)
+        state, self._h, n = dormand_prince(f, state, dt, self.error_tolerance, self._h)
+        self.evaluations += n
+        self._x, self._y, self._theta = (float(s) for s in state)
+
+    @staticmethod
+    def step(x, y, theta, v, w, dt, tol=1e-3, error_tolerance=1e-6):
+        f = lambda t, s: _unicycle(s, v, w)
+        state = np.stack(np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (x, y, theta))))
+        state, _, _ = dormand_prince(f, state, dt, error_tolerance)
+        return state[0], state[1], state[2]
+
+    @staticmethod
+    def jacobians(x, y, theta, v, w, dt, tol=1e-3):
+        # Same unicycle ODE, whose exact solution is the analytical arc
+        return AnalyticalSkidDriveOdometer.jacobians(x, y, theta, v, w, dt, tol)
@@ -0,0 +1,50 @@
+import numpy as np
+
+##############################################################################################
+
+# Columns of a recorded timeline
+T, X, Y, THETA, VL, VR = range(6)
+
+class Recorder:
+    """
+    Records the pose timeline of a robot at full resolution.
+    Each row is (t, x, y, theta, vl, vr); storage grows geometrically.
+    """
+
+    def __init__(self, capacity=1024):
+        self._data = np.zeros((max(1, int(capacity)), 6), dtype=float)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def record(self, t, robot):
+        x, y, theta = robot.odometer.pose()
+        vr, vl = robot.odometer.velocities()
+        if self._size == len(self._data):
+            self._data = np.vstack([self._data, np.zeros_like(self._data)])
+        self._data[self._size] = (t, x, y, theta, vl, vr)
+        self._size += 1
+
+    def timeline(self):
+        return self._data[:self._size].copy()
+
+    def poses(self):
+        return self._data[:self._size, X:THETA + 1].copy()
+
+    def positions(self):
+        return self._data[:self._size, X:Y + 1].copy()
+
+    def clear(self):
+        self._size = 0
+
+    def save(self, filename):
+        np.save(filename, self._data[:self._size])
+
+    @classmethod
+    def load(cls, filename):
+        data = np.load(filename)
+        recorder = cls(len(data))
+        recorder._data[:len(data)] = data
+        recorder._size = len(data)
+        return recorder
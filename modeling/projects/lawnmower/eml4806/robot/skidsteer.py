@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 import numpy as np
 
-from eml4806.geometry.vector import vector, coincident
+from eml4806.geometry.vector import vector
 from eml4806.geometry.transform import Transform
 from eml4806.graphics.style import Color, Style, Stroke, Fill
 from eml4806.graphics.shape import Rectangle, Circle, Polyline, Group, Arrow
@@ -20,7 +20,11 @@ class Wheel:
 
 @dataclass
 class Motor:
-    maximum_angular_velocity: float = 0.0  # rad/s
+    maximum_angular_velocity    : float = 0.0           # rad/s
+    time_constant               : float = 0.0           # s (first-order lag, 0 is instantaneous)
+    maximum_torque              : float = float("inf")  # N m (at the wheel)
+    inertia                     : float = 0.0           # kg m^2 (reflected to the wheel, 0 ignores torque)
+    maximum_angular_acceleration: float = float("inf")  # rad/s^2
 
 @dataclass
 class Blade:
@@ -29,12 +33,14 @@ class Blade:
     height: float = 0.0 # m
 
 class Robot:
-    def __init__(self, workspace, x, y, theta, chassis, wheels, motors, blade, odometer):
+    def __init__(self, workspace, x, y, theta, chassis, wheels, motors, blade, odometer, drivetrain=None):
         # Body
         self.chassis = chassis
         self.wheels = wheels
         self.motors = motors
         self.blade = blade
+        # Optional motor dynamics, commands are applied instantly otherwise
+        self.drivetrain = drivetrain
         # Odometry
         self.odometer = odometer
         self.odometer.initilize(x, y, theta)
@@ -48,9 +54,29 @@ class Robot:
 
     # Control wheel shaft rotation (rad/s)
     def move(self, vl, vr, dt):
+        if self.drivetrain is not None:
+            vl, vr = self.drivetrain.step(vl, vr, dt)
         self.odometer.integrate(vl, vr, dt, tol=0.001)
         self._update()
 
+    # Teleport the robot to a known pose and wheel speeds (e.g. when replaying a recorded run)
+    def place(self, x, y, theta, vl=0.0, vr=0.0):
+        self.odometer.setState(x, y, theta, vl, vr)
+        self._update()
+
+    # Show or hide the whole robot, the debug parts follow setDebug while shown
+    def setVisible(self, visible):
+        if visible:
+            self.body.show()
+            self.path.show()
+            if not self._debug:
+                self.path.hide()
+                self.arrow_vl.hide()
+                self.arrow_vr.hide()
+        else:
+            self.body.hide()
+            self.path.hide()
+
     def debug(self):
         return self._debug
     
@@ -72,20 +98,22 @@ class Robot:
         c = self.chassis
         w = self.wheels
         b = self.blade
+        wheel = Style.brush(Color(0.5,0.5,0.5), 0.5)
+        arrow = Style.brush(Color(0.0,0.0,1.0), 0.5, 3.0)
         self.body   = Rectangle(workspace, 0.0, 0.0, c.length, c.width, style=Style.brush(Color(1.0,0.55,0.0), 0.5))
-        self.wheel1 = Rectangle(workspace, -0.5*c.wheelbase, -0.5*c.trackwidth, w.diameter, w.width, style=Style.brush(Color(0.5,0.5,0.5), 0.5))
-        self.wheel2 = Rectangle(workspace,  0.5*c.wheelbase, -0.5*c.trackwidth, w.diameter, w.width, style=Style.brush(Color(0.5,0.5,0.5), 0.5))
-        self.wheel3 = Rectangle(workspace, -0.5*c.wheelbase,  0.5*c.trackwidth, w.diameter, w.width, style=Style.brush(Color(0.5,0.5,0.5), 0.5))
-        self.wheel4 = Rectangle(workspace,  0.5*c.wheelbase,  0.5*c.trackwidth, w.diameter, w.width, style=Style.brush(Color(0.5,0.5,0.5), 0.5))
+        self.wheel1 = Rectangle(workspace, -0.5*c.wheelbase, -0.5*c.trackwidth, w.diameter, w.width, style=wheel)
+        self.wheel2 = Rectangle(workspace,  0.5*c.wheelbase, -0.5*c.trackwidth, w.diameter, w.width, style=wheel)
+        self.wheel3 = Rectangle(workspace, -0.5*c.wheelbase,  0.5*c.trackwidth, w.diameter, w.width, style=wheel)
+        self.wheel4 = Rectangle(workspace,  0.5*c.wheelbase,  0.5*c.trackwidth, w.diameter, w.width, style=wheel)
         self.tool   = Circle(workspace, 0.0, 0.0, 0.5*b.diameter, style=Style.brush(Color(1.0,0.0,0.0), 0.5))
         # Debug
-        self.arrow_vl = Arrow(workspace, 0.0, 0.5*c.trackwidth, 0.0, 0.0, style=Style.brush(Color(0.0,0.0,1.0), 0.5, 3.0), scaling=1.25)
-        self.arrow_vr = Arrow(workspace, 0.0,-0.5*c.trackwidth, 0.0, 0.0, style=Style.brush(Color(0.0,0.0,1.0), 0.5, 3.0), scaling=1.25)
+        self.arrow_vl = Arrow(workspace, 0.0, 0.5*c.trackwidth, 0.0, 0.0, style=arrow, scaling=1.25)
+        self.arrow_vr = Arrow(workspace, 0.0,-0.5*c.trackwidth, 0.0, 0.0, style=arrow, scaling=1.25)
         # Assembly
         self.body = Group([self.body, self.wheel1, self.wheel2, self.wheel3, self.wheel4, self.tool, self.arrow_vl, self.arrow_vr])
         # Path
         x, y = self.odometer.position()
-        self.path = Polyline(workspace, [x, y], style=Style.pen(Color(1.0,0.0,1.0)))
+        self.path = Polyline(workspace, [x, y], style=Style.pen(Color(1.0,0.0,1.0)), tolerance=1e-2, resolution=0.5)
         # Update graphics
         self._update()
 
@@ -100,11 +128,9 @@ class Robot:
         self.body.setTransform(tf)
     
     def _updatePath(self):
+        # Coincident and collinear points are pruned by the path itself
         x, y = self.odometer.position()
-        position = vector(x, y)
-        last = self.path.last()
-        if not coincident(position, last):
-            self.path.append( position )
+        self.path.append( vector(x, y) )
 
     def _updateDebug(self):
         vl, vr = self.odometer.velocities()
@@ -0,0 +1,124 @@
+import io
+import os
+import json
+import dataclasses
+from dataclasses import dataclass
+import numpy as np
+
+import eml4806.robot.odometry as odometry
+from eml4806.control.pd import PDController
+
+##############################################################################################
+
+# Snapshots are uncompressed NumPy .npz archives: raw arrays for the bulky state (path,
+# controller, coverage) plus a small JSON header for scalars, odometer parameters and the RNG
+# state. Nothing in them refers to graphics, so they load into headless simulations.
+# Filenames get the .npz suffix when they lack it, on save and on load alike.
+
+VERSION = 1
+
+@dataclass
+class Snapshot:
+    t         : float = 0.0
+    odometer  : object = None  # SkidDriveOdometer, initialized to the saved state
+    path      : np.ndarray = None  # (K, 2)
+    controller: PDController = None
+    coverage  : np.ndarray = None
+    rng       : np.random.Generator = None
+
+def save(file, t=0.0, odometer=None, path=None, controller=None, coverage=None, rng=None):
+    """
+    Write a snapshot to a filename or binary file object. path may be a Polyline or an array.
+    """
+    file = _filename(file)
+    meta = {"version": VERSION, "t": float(t)}
+    arrays = {}
+    if odometer is not None:
+        meta["odometer"] = {
+            "class": type(odometer).__name__,
+            "fields": dataclasses.asdict(odometer),
+            "state": [float(v) for v in odometer.state()],
+        }
+    if path is not None:
+        arrays["path"] = np.asarray(path.points() if hasattr(path, "points") else path, dtype=float)
+    if controller is not None:
+        for name in ("speed", "kp", "kd", "vmax", "last_error"):
+            arrays["controller_" + name] = getattr(controller, name)
+    if coverage is not None:
+        arrays["coverage"] = np.asarray(coverage)
+    if rng is not None:
+        meta["rng"] = _encode(rng.bit_generator.state)
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+    np.savez(file, **arrays)
+
+def load(file):
+    """
+    Read a snapshot written by save.
+    """
+    with np.load(_filename(file)) as data:
+        meta = json.loads(data["meta"].tobytes().decode())
+        if meta["version"] != VERSION:
+            raise ValueError(f"Unsupported snapshot version {meta['version']}.")
+        snapshot = Snapshot(t=meta["t"])
+        if "odometer" in meta:
+            o = meta["odometer"]
+            snapshot.odometer = getattr(odometry, o["class"])(**o["fields"])
+            snapshot.odometer.setState(*o["state"])
+        if "path" in data:
+            snapshot.path = data["path"]
+        if "controller_last_error" in data:
+            c = PDController(len(data["controller_last_error"]), data["controller_speed"], data["controller_kp"],
+                             data["controller_kd"], data["controller_vmax"])
+            c.last_error[:] = data["controller_last_error"]
+            snapshot.controller = c
+        if "coverage" in data:
+            snapshot.coverage = data["coverage"]
+        if "rng" in meta:
+            state = _decode(meta["rng"])
+            bit_generator = getattr(np.random, state["bit_generator"])()
+            bit_generator.state = state
+            snapshot.rng = np.random.Generator(bit_generator)
+    return snapshot
+
+def restore(snapshot, robot):
+    """
+    Put a Robot (with graphics) back into the snapshot pose and path.
+    """
+    if snapshot.odometer is not None:
+        robot.odometer.setState(*snapshot.odometer.state())
+    if snapshot.path is not None:
+        robot.path.setPoints(snapshot.path)
+    robot._update()
+
+def _filename(file):
+    # np.savez appends .npz to filenames but np.load does not
+    if isinstance(file, (str, os.PathLike)):
+        file = os.fspath(file)
+        if not file.endswith(".npz"):
+            file += ".npz"
+    return file
+
+def _encode(value):
+    # JSON form of a bit generator state, e.g. the uint32 key array of MT19937
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, np.ndarray):
+        return {"ndarray": value.tolist(), "dtype": value.dtype.str}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _decode(value):
+    if isinstance(value, dict):
+        if set(value) == {"ndarray", "dtype"}:
+            return np.array(value["ndarray"], dtype=value["dtype"])
+        return {k: _decode(v) for k, v in value.items()}
+    return value
+
+def dumps(**state):
+    buffer = io.BytesIO()
+    save(buffer, **state)
+    return buffer.getvalue()
+
+def loads(data):
+    return load(io.BytesIO(data))
@@ -0,0 +1,25 @@
+import itertools
+import multiprocessing as mp
+
+##############################################################################################
+
+def variants(scenario, grid):
+    """
+    Every combination of the values in grid, e.g. {"controller.kp": [0.01, 0.02]}, as
+    scenario variants named after their index.
+    """
+    keys = list(grid)
+    return [scenario.variant(dict(zip(keys, values)), name=f"{scenario.name}-{k}")
+            for k, values in enumerate(itertools.product(*(grid[key] for key in keys)))]
+
+def fan_out(function, scenarios, processes=None, chunksize=16):
+    """
+    Run function(scenario) for every scenario in worker processes and return the results in
+    order. function must be importable (module level); scenarios only carry plain values, so
+    nothing graphical crosses the process boundary. Workers are spawned, so they start clean.
+    """
+    scenarios = list(scenarios)
+    if processes == 1:
+        return [function(s) for s in scenarios]
+    with mp.get_context("spawn").Pool(processes) as pool:
+        return pool.map(function, scenarios, chunksize)
@@ -0,0 +1,249 @@
+import copy
+import json
+import math
+import os
+from dataclasses import dataclass
+
+from eml4806.robot.odometry import (FirstOrderSkidDriveOdometer, SecondOrderSkidDriveOdometer,
+                                    AnalyticalSkidDriveOdometer, AdaptiveSkidDriveOdometer)
+from eml4806.robot.skidsteer import Chassis, Wheel, Motor, Blade
+
+##############################################################################################
+
+# Scenario files (TOML or JSON) describe a simulation run:
+#
+#   name = "husky"
+#   [simulation]  dt
+#   [workspace]   xmin, xmax, ymin, ymax
+#   [dock]        x, y, heading (deg)
+#   [chassis]     length, width, wheelbase, trackwidth
+#   [wheels]      diameter, width
+#   [motors]      maximum_angular_velocity, time_constant, maximum_torque, inertia,
+#                 maximum_angular_acceleration
+#   [blade]       diameter (90% of the chassis width by default), height, on
+#   [odometer]    model (first, second, analytical, adaptive), track_width,
+#                 maximum_linear_velocity, maximum_angular_velocity
+#   [controller]  speed, kp, kd, vmax
+#
+# Missing optional values take the defaults below. A Scenario only holds plain values, so it
+# pickles cheaply to worker processes; matplotlib objects are built on demand.
+
+ODOMETERS = {
+    "first"     : FirstOrderSkidDriveOdometer,
+    "second"    : SecondOrderSkidDriveOdometer,
+    "analytical": AnalyticalSkidDriveOdometer,
+    "adaptive"  : AdaptiveSkidDriveOdometer,
+}
+
+_REQUIRED = object()
+
+def _positive(value):
+    return value > 0.0 or "must be positive"
+
+def _nonnegative(value):
+    return value >= 0.0 or "must not be negative"
+
+def _model(value):
+    return value in ODOMETERS or f"must be one of {', '.join(ODOMETERS)}"
+
+# section: {field: (type, default, check)}
+_SCHEMA = {
+    "simulation": {
+        "dt"                          : (float, 0.1, _positive),
+    },
+    "workspace": {
+        "xmin"                        : (float, _REQUIRED, None),
+        "xmax"                        : (float, _REQUIRED, None),
+        "ymin"                        : (float, _REQUIRED, None),
+        "ymax"                        : (float, _REQUIRED, None),
+    },
+    "dock": {
+        "x"                           : (float, 0.0, None),
+        "y"                           : (float, 0.0, None),
+        "heading"                     : (float, 0.0, None),
+    },
+    "chassis": {
+        "length"                      : (float, _REQUIRED, _positive),
+        "width"                       : (float, _REQUIRED, _positive),
+        "wheelbase"                   : (float, _REQUIRED, _positive),
+        "trackwidth"                  : (float, _REQUIRED, _positive),
+    },
+    "wheels": {
+        "diameter"                    : (float, _REQUIRED, _positive),
+        "width"                       : (float, _REQUIRED, _positive),
+    },
+    "motors": {
+        "maximum_angular_velocity"    : (float, _REQUIRED, _positive),
+        "time_constant"               : (float, 0.0, _nonnegative),
+        "maximum_torque"              : (float, math.inf, _positive),
+        "inertia"                     : (float, 0.0, _nonnegative),
+        "maximum_angular_acceleration": (float, math.inf, _positive),
+    },
+    "blade": {
+        "diameter"                    : (float, None, _nonnegative),
+        "height"                      : (float, 0.0, _nonnegative),
+        "on"                          : (bool, False, None),
+    },
+    "odometer": {
+        "model"                       : (str, "analytical", _model),
+        "track_width"                 : (float, None, _positive),
+        "maximum_linear_velocity"     : (float, None, _positive),
+        "maximum_angular_velocity"    : (float, None, _positive),
+    },
+    "controller": {
+        "speed"                       : (float, 0.0, None),
+        "kp"                          : (float, 0.0, None),
+        "kd"                          : (float, 0.0, None),
+        "vmax"                        : (float, None, _positive),
+    },
+}
+
+##############################################################################################
+
+def _validate(data, origin):
+    # Single pass over the schema: type checks, constraints, defaults and unknown keys,
+    # collecting every problem before failing
+    errors = []
+    values = {"name": data.get("name", os.path.splitext(os.path.basename(origin))[0])}
+    if not isinstance(values["name"], str):
+        errors.append("name: must be a string")
+    for key in data:
+        if key != "name" and key not in _SCHEMA:
+            errors.append(f"{key}: unknown section")
+    for section, fields in _SCHEMA.items():
+        given = data.get(section, {})
+        if not isinstance(given, dict):
+            errors.append(f"{section}: must be a table")
+            given = {}
+        for key in given:
+            if key not in fields:
+                errors.append(f"{section}.{key}: unknown field")
+        out = values[section] = {}
+        for key, (kind, default, check) in fields.items():
+            if key not in given:
+                if default is _REQUIRED:
+                    errors.append(f"{section}.{key}: missing")
+                out[key] = None if default is _REQUIRED else default
+                continue
+            value = given[key]
+            if kind is float and type(value) in (int, float):
+                value = float(value)
+            elif type(value) is not kind:
+                errors.append(f"{section}.{key}: expected {kind.__name__}, got {type(value).__name__}")
+                out[key] = None
+                continue
+            problem = True if check is None else check(value)
+            if problem is not True:
+                errors.append(f"{section}.{key}: {problem}")
+            out[key] = value
+    if not errors:
+        w = values["workspace"]
+        if w["xmin"] >= w["xmax"] or w["ymin"] >= w["ymax"]:
+            errors.append("workspace: minimum must be below maximum")
+    if errors:
+        raise ValueError(f"Invalid scenario {origin}:\n  " + "\n  ".join(errors))
+    return values
+
+def load(filename):
+    """
+    Read and validate a .toml or .json scenario file.
+    """
+    if filename.endswith(".json"):
+        with open(filename, "r") as f:
+            data = json.load(f)
+    else:
+        try:
+            import tomllib
+        except ImportError:
+            raise ImportError("TOML scenarios need Python 3.11 or newer, use a .json scenario instead.")
+        with open(filename, "rb") as f:
+            data = tomllib.load(f)
+    return Scenario.fromDict(data, filename)
+
+##############################################################################################
+
+@dataclass
+class Scenario:
+    """
+    A validated scenario. Holds plain values only and builds the simulation objects.
+    """
+    name: str
+    values: dict
+
+    @classmethod
+    def fromDict(cls, data, origin="<dict>"):
+        values = _validate(data, origin)
+        return cls(values.pop("name"), values)
+
+    def variant(self, changes, name=None):
+        """
+        A copy with dotted fields replaced, e.g. {"controller.kp": 0.03}, validated again.
+        """
+        data = copy.deepcopy(self.values)
+        for key, value in changes.items():
+            section, _, field = key.partition(".")
+            data.setdefault(section, {})[field] = value
+        data = {section: {k: v for k, v in fields.items() if v is not None} for section, fields in data.items()}
+        data["name"] = self.name if name is None else name
+        return Scenario.fromDict(data, data["name"])
+
+    @property
+    def dt(self):
+        return self.values["simulation"]["dt"]
+
+    @property
+    def bounds(self):
+        w = self.values["workspace"]
+        return w["xmin"], w["xmax"], w["ymin"], w["ymax"]
+
+    @property
+    def dock(self):
+        d = self.values["dock"]
+        return d["x"], d["y"], math.radians(d["heading"])
+
+    @property
+    def chassis(self):
+        return Chassis(**self.values["chassis"])
+
+    @property
+    def wheels(self):
+        return Wheel(**self.values["wheels"])
+
+    @property
+    def motors(self):
+        return Motor(**self.values["motors"])
+
+    @property
+    def blade(self):
+        # The blade spans 90% of the chassis width unless given
+        b = dict(self.values["blade"])
+        if b["diameter"] is None:
+            b["diameter"] = 0.9 * self.values["chassis"]["width"]
+        return Blade(**b)
+
+    def vmax(self):
+        # Wheel speed limit of the controller, the motor limit at the wheel rim by default
+        c = self.values["controller"]
+        if c["vmax"] is not None:
+            return c["vmax"]
+        return self.values["motors"]["maximum_angular_velocity"] * 0.5 * self.values["wheels"]["diameter"]
+
+    def makeOdometer(self):
+        o = self.values["odometer"]
+        track_width = o["track_width"] if o["track_width"] is not None else self.values["chassis"]["trackwidth"]
+        return ODOMETERS[o["model"]](track_width, o["maximum_linear_velocity"], o["maximum_angular_velocity"])
+
+    def makeWorkspace(self, interactive=True):
+        from eml4806.graphics.workspace import Workspace
+        return Workspace(*self.bounds, interactive)
+
+    def makeRobot(self, workspace, x=None, y=None, theta=None, drivetrain=None):
+        from eml4806.robot.skidsteer import Robot
+        x0, y0, theta0 = self.dock
+        return Robot(workspace, x0 if x is None else x, y0 if y is None else y, theta0 if theta is None else theta,
+                     self.chassis, self.wheels, self.motors, self.blade, self.makeOdometer(), drivetrain)
+
+    def makeController(self, count=1):
+        from eml4806.control.pd import PDController
+        c = self.values["controller"]
+        return PDController(count, c["speed"], c["kp"], c["kd"], self.vmax())
@@ -0,0 +1,50 @@
+import numpy as np
+
+##############################################################################################
+
+class SensorBuffer:
+    """
+    Timestamped ring buffer of the readings of one sensor for N robots.
+    Each entry is a time stamp and an (N, C) block of channels; the oldest entries are
+    overwritten once the capacity is reached. Reads return every robot at once.
+    """
+
+    def __init__(self, robots, channels, capacity=256):
+        self.robots = int(robots)
+        self.channels = int(channels)
+        self.capacity = int(capacity)
+        self._time = np.zeros(self.capacity, dtype=float)
+        self._data = np.zeros((self.capacity, self.robots, self.channels), dtype=float)
+        self._count = 0 # Entries pushed so far
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def push(self, time, values):
+        k = self._count % self.capacity
+        self._time[k] = time
+        self._data[k] = values
+        self._count += 1
+
+    def latest(self):
+        """
+        Newest (time, (N, C) values), or None while empty.
+        """
+        if self._count == 0:
+            return None
+        k = (self._count - 1) % self.capacity
+        return float(self._time[k]), self._data[k].copy()
+
+    def read(self, since=-np.inf):
+        """
+        Entries newer than since, oldest first, as times (M,) and values (M, N, C).
+        """
+        n = len(self)
+        rows = np.arange(self._count - n, self._count) % self.capacity
+        times = self._time[rows]
+        keep = times > since
+        rows = rows[keep]
+        return times[keep], self._data[rows]
+
+    def clear(self):
+        self._count = 0
@@ -0,0 +1,157 @@
+from abc import ABC, abstractmethod
+from itertools import chain
+import numpy as np
+
+from eml4806.sensor.buffer import SensorBuffer
+
+##############################################################################################
+
+# Sensors observe a source of N robots, either a RobotFleet or a sequence of Robots, and
+# sample all of them in one vectorized call per event of the shared Scheduler. A sequence of
+# Robots is stacked once per sensor, so a tick does not rebuild its static columns.
+
+class _Stack:
+    """
+    Stacked view of a sequence of Robots, built once per sensor: track widths and wheel
+    radii are fixed and gathered up front, and odometer states are read in one pass into
+    a preallocated (N, 5) buffer.
+    """
+
+    def __init__(self, robots):
+        self.odometers = [robot.odometer for robot in robots]
+        self.track = np.array([odometer.track_width for odometer in self.odometers], dtype=float)
+        self.radius = np.array([0.5 * robot.wheels.diameter for robot in robots], dtype=float)
+        self.states = np.empty((len(self.odometers), 5))
+
+    def __len__(self):
+        return len(self.odometers)
+
+    def state(self):
+        flat = self.states.reshape(-1)
+        flat[:] = np.fromiter(chain.from_iterable(odometer.state() for odometer in self.odometers),
+                              dtype=float, count=flat.size)
+        return self.states[:, :3], self.states[:, 3:5], self.track, self.radius
+
+def _view(source):
+    # A RobotFleet already stores its state as columns, a sequence of Robots is stacked once
+    return source if hasattr(source, "poses") else _Stack(source)
+
+def _state(view):
+    # Poses (N, 3), wheel speeds (N, 2) as (vl, vr), track widths (N,) and wheel radii (N,)
+    if isinstance(view, _Stack):
+        return view.state()
+    return (view.poses(), np.column_stack((view.vl, view.vr)),
+            view.track_width, 0.5 * view.wheel_diameter)
+
+##############################################################################################
+
+class Sensor(ABC):
+    """
+    A sensor sampled at its own rate (Hz) for every robot of a source, with readings kept
+    in a SensorBuffer of `channels` values per robot.
+    """
+
+    channels = 0
+
+    def __init__(self, source, rate, capacity=256, seed=None):
+        if rate <= 0.0:
+            raise ValueError(f"Sensor rate must be positive, got {rate}.")
+        self.source = source
+        self.view = _view(source)
+        self.rate = float(rate)
+        self.period = 1.0 / self.rate
+        self.robots = len(source)
+        self.buffer = SensorBuffer(self.robots, self.channels, capacity)
+        self.rng = np.random.default_rng(seed)
+        self.scheduler = None
+
+    def attach(self, scheduler, start=None):
+        self.scheduler = scheduler
+        scheduler.every(self.period, self.sample, start)
+        return self
+
+    def read(self, since=-np.inf):
+        return self.buffer.read(since)
+
+    def latest(self):
+        return self.buffer.latest()
+
+    @abstractmethod
+    def sample(self, t): ...
+
+##############################################################################################
+
+class GPS(Sensor):
+    """
+    Position fixes (x, y) with Gaussian noise (m), typically at 1-10 Hz.
+    A fix taken at time t becomes readable latency seconds later, stamped with t.
+    """
+
+    channels = 2
+
+    def __init__(self, source, rate=5.0, noise=0.02, latency=0.0, capacity=256, seed=None):
+        super().__init__(source, rate, capacity, seed)
+        self.noise = float(noise)
+        self.latency = float(latency)
+
+    def sample(self, t):
+        poses = _state(self.view)[0]
+        fix = poses[:, :2] + self.noise * self.rng.standard_normal((self.robots, 2))
+        if self.latency > 0.0 and self.scheduler is not None:
+            self.scheduler.at(t + self.latency, lambda _: self.buffer.push(t, fix))
+        else:
+            self.buffer.push(t, fix)
+
+##############################################################################################
+
+class IMU(Sensor):
+    """
+    Yaw rate (rad/s) and forward acceleration (m/s^2).
+    The gyro reads the true yaw rate plus a constant per-robot bias (drawn with std bias)
+    and white noise; the accelerometer differentiates the forward speed between samples.
+    """
+
+    channels = 2
+
+    def __init__(self, source, rate=50.0, gyro_noise=0.01, bias=0.0, accel_noise=0.05, capacity=256, seed=None):
+        super().__init__(source, rate, capacity, seed)
+        self.gyro_noise = float(gyro_noise)
+        self.accel_noise = float(accel_noise)
+        self.bias = bias * self.rng.standard_normal(self.robots)
+        self._v = None
+
+    def sample(self, t):
+        _, wheels, track, _ = _state(self.view)
+        v = 0.5 * (wheels[:, 0] + wheels[:, 1])
+        w = (wheels[:, 1] - wheels[:, 0]) / track
+        a = np.zeros(self.robots) if self._v is None else (v - self._v) / self.period
+        self._v = v
+        e = self.rng.standard_normal((self.robots, 2))
+        reading = np.empty((self.robots, 2))
+        reading[:, 0] = w + self.bias + self.gyro_noise * e[:, 0]
+        reading[:, 1] = a + self.accel_noise * e[:, 1]
+        self.buffer.push(t, reading)
+
+##############################################################################################
+
+class Encoder(Sensor):
+    """
+    Cumulative wheel encoder ticks (left, right) at `resolution` ticks per revolution.
+    Wheel rotation is integrated between samples, optionally with Gaussian fractional slip.
+    """
+
+    channels = 2
+
+    def __init__(self, source, rate=20.0, resolution=1024, slip=0.0, capacity=256, seed=None):
+        super().__init__(source, rate, capacity, seed)
+        self.resolution = int(resolution)
+        self.slip = float(slip)
+        self.angle = np.zeros((self.robots, 2)) # Wheel rotation (rad)
+
+    def sample(self, t):
+        _, wheels, _, radius = _state(self.view)
+        travel = wheels * self.period
+        if self.slip > 0.0:
+            travel = travel * (1.0 + self.slip * self.rng.standard_normal((self.robots, 2)))
+        self.angle += travel / radius[:, None]
+        self.buffer.push(t, np.floor(self.angle * (self.resolution / (2.0 * np.pi))))
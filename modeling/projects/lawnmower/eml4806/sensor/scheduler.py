@@ -0,0 +1,49 @@
+import heapq
+import itertools
+
+##############################################################################################
+
+class Scheduler:
+    """
+    Shared event scheduler of simulated time.
+
+    Events are (time, callback) pairs kept in a heap; advance(t) runs every event due by t
+    in time order, calling callback(event_time). Periodic events reschedule themselves, so a
+    tick with nothing due costs a single heap peek.
+    """
+
+    def __init__(self, time=0.0):
+        self.time = float(time)
+        self._queue = []
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def at(self, time, callback):
+        heapq.heappush(self._queue, (float(time), next(self._order), callback))
+
+    def every(self, period, callback, start=None):
+        period = float(period)
+        if period <= 0.0:
+            raise ValueError(f"Event period must be positive, got {period}.")
+        start = self.time + period if start is None else float(start)
+        count = itertools.count(1)
+
+        # Event times are start + k*period, so they do not accumulate rounding errors
+        def periodic(t):
+            callback(t)
+            self.at(start + next(count) * period, periodic)
+
+        self.at(start, periodic)
+
+    def advance(self, time, tol=1e-9):
+        queue = self._queue
+        while queue and queue[0][0] <= time + tol:
+            t, _, callback = heapq.heappop(queue)
+            self.time = t
+            callback(t)
+        self.time = float(time)
+
+    def clear(self):
+        self._queue.clear()
@@ -2,6 +2,8 @@
 # Lawn mower robot
 # https://youtu.be/2Rhsv8fFqCE
 
+import copy
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -9,17 +11,15 @@ import eml4806.geometry.angle as angle
 
 import eml4806.sensor.keyboard as keyboard
 
-from eml4806.geometry.vector import vector
-from eml4806.graphics.workspace import Workspace
-from eml4806.graphics.shape import Rectangle, Circle, Polyline, Group, Arrow
+from eml4806.graphics.shape import Circle
 from eml4806.graphics.style import Color, Style
-from eml4806.geometry.transform import Transform
-from eml4806.robot.odometry import AnalyticalSkidDriveOdometer
-from eml4806.robot.skidsteer import Chassis, Wheel, Motor, Blade, Robot
+from eml4806.scenario.loader import load
+from eml4806.control.lookahead import Lookahead, PredictiveController, fan
+from eml4806.geometry.line import closest_points_on_segment
 
 
-def plot_path(points, ptype="line"):
-    plt.plot(points[0], points[1], c='k')
+def plot_path(points, ptype="line", ax=None):
+    (plt.gca() if ax is None else ax).plot(points[0], points[1], c='k')
     return None
 
 
@@ -71,58 +71,35 @@ def find_closest_point_on_segment(x1, y1, x2, y2, px, py):
 
     return P_closest[0], P_closest[1]
 
-def main():
+# Default scenario, the Husky A200 lawn mower
+SCENARIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios", "husky.toml")
 
-    # Land
-    xmin = -1.0
-    xmax = 10.0
-    ymin = -1.0
-    ymax = 10.0
+# keys      : source of key presses, one call per tick (scripted input for soak tests)
+# interactive: headless runs never open a window
+# scenario  : scenario file with the robot, workspace, controller and simulation parameters
+# draw      : optional predicate deciding whether a tick is rendered (every tick by default)
+def main(keys=keyboard.key, interactive=True, scenario=SCENARIO, draw=None):
+
+    scenario = load(scenario)
 
-    workspace = Workspace(xmin, xmax, ymin, ymax)
+    # Land
+    workspace = scenario.makeWorkspace(interactive)
 
     # Robot docking station
-    x0 = 0.0  # m
-    y0 = 0.0  # m
-    theta0 = np.deg2rad(10.0)  # rad
+    x0, y0, theta0 = scenario.dock
 
     dock = Circle(workspace, x0, y0, 0.1, style=Style.brush(Color(1.0, 0.0, 1.0)))
 
-    # Robot physics
-    # ClearPath Husky A200 Ground Platform
-    # https://docs.clearpathrobotics.com/docs_robots/outdoor_robots/husky/a200/user_manual_husky/
-
-    chassis = Chassis()
-    chassis.length = 0.812  # m
-    chassis.width = 0.421  # m
-    chassis.wheelbase = 0.512  # m
-    chassis.trackwidth = 0.550  # m
-
-    wheels = Wheel()
-    wheels.diameter = 0.330  # m
-    wheels.width = 0.114  # m
-
-    motors = Motor()
-    motors.maximum_angular_velocity = 5.45  # rad/s (~52 rpm maximum)
-    
-    blade = Blade()
-    blade.diameter = 0.9 * chassis.width  # m
-    blade.height = 0.05  # m (~2 inches)
-
-    odometer = AnalyticalSkidDriveOdometer()
-    odometer.track_width = chassis.trackwidth
-    odometer.maximum_linear_velocity = 1.0  # m/s
-    odometer.maximum_angular_velocity = 3.5  # rad/s
-
     # Simulated robot
-    robot = Robot(workspace, x0, y0, theta0, chassis, wheels, motors, blade, odometer)
+    robot = scenario.makeRobot(workspace)
     robot.setDebug(False)
+    odometer = robot.odometer
 
     # Direct wheel-speed control modeling a microcontroller-style PWM motor driver
     # v = omega*r_wheel
     vl = 0.0  # Left track linear velocity (m/s)
     vr = 0.0  # Left track linear velocity (m/s)
-    vmax = motors.maximum_angular_velocity * (0.5* wheels.diameter)
+    vmax = scenario.vmax()
 
     # Controller sensitivity
     dv = 0.07  # m/s, Linear velocity increase
@@ -130,22 +107,47 @@ def main():
 
     # Simulation
     t = 0.0 # s
-    dt = 0.1 # s (~50 Hz)
+    dt = scenario.dt # s
 
     line_pts = [[1, 8], [2, 9]]
-    plot_path(line_pts)
+    plot_path(line_pts, ax=workspace.axis)
 
     closest_p = find_closest_point_on_segment(x1=line_pts[0][0], x2=line_pts[0][1], y1=line_pts[1][0],
                                               y2=line_pts[1][1], px=x0, py=y0)
-    plotted_closest = plt.scatter(closest_p[0], closest_p[1])
+    plotted_closest = workspace.axis.scatter(closest_p[0], closest_p[1])
     robot.setDebug(True)
-    last_error = [0,0]
+    controller = scenario.makeController()
     stored_errors = []
 
+    # Lookahead, press [p] to toggle the predicted path and [m] the predictive controller
+    p1 = np.array([line_pts[0][0], line_pts[1][0]], dtype=float)
+    p2 = np.array([line_pts[0][1], line_pts[1][1]], dtype=float)
+    horizon = 30  # steps (3 s)
+    lookahead = Lookahead(workspace, odometer, horizon, dt)
+    preview = True
+    predictive = False
+
+    def tracking_cost(poses, commands):
+        # Squared distance to the segment over the horizon, plus a little steering effort
+        p = poses[:, :, :2].reshape(-1, 2)
+        d = closest_points_on_segment(p, p1, p2) - p
+        distance = np.einsum("ij,ij->i", d, d).reshape(poses.shape[:2])
+        effort = (commands[:, :, 1] - commands[:, :, 0]) ** 2
+        return distance.sum(axis=1) + 0.01 * effort.sum(axis=1)
+
+    mpc = PredictiveController(odometer, horizon, dt, tracking_cost)
+
+    # Status overlay, refreshed by the workspace a few times per second
+    hud = workspace.hud({
+        "time" : "t     {:8.1f} s",
+        "error": "Error {:8.4f} m",
+        "wheel": "vl {:+6.3f} vr {:+6.3f} m/s",
+    })
+
     while True:
 
         # User controller
-        key = keyboard.key()
+        key = keys()
 
         # Commands inside the microntroller
         if key == "q":
@@ -167,6 +169,11 @@ def main():
             vr = 0.0
         elif key == "d":
             robot.setDebug( not robot.debug() )
+        elif key == "p":
+            preview = not preview
+            lookahead.setVisible(preview)
+        elif key == "m":
+            predictive = not predictive
           
         # Motors physical limits
         vl = np.clip(vl, -vmax, vmax)
@@ -187,31 +194,44 @@ def main():
         cur_error = closest_p-np.array([x,y])
         norm_error = np.linalg.norm(cur_error)
         stored_errors.append(norm_error)
-        plt.title(f"Error = {norm_error}")
+        hud.set("error", norm_error)
+
+        vl, vr = controller.command(cur_error, dt)
 
-        v = 0.2
-        k_p = 0.0225
-        k_d = 0.09
+        # Lookahead
+        if predictive:
+            candidates = fan(vl, vr, 32, horizon, 0.3, vmax)
+            vl, vr = mpc.command(odometer.pose(), candidates)
+            if preview:
+                lookahead.show(mpc.poses)
+        elif preview:
+            # The controller policy replayed on a copy of its state
+            policy_controller = copy.deepcopy(controller)
 
-        dt_diff = (cur_error - last_error)/dt
-        vl = v + k_p*cur_error[0] + k_d*dt_diff[0]
-        vr = v + k_p*cur_error[1] + k_d*dt_diff[1]
+            def policy(px, py, ptheta):
+                p = np.column_stack((px, py))
+                return policy_controller.command(closest_points_on_segment(p, p1, p2) - p, dt)
 
-        last_error = cur_error
+            lookahead.follow(policy)
 
         # Actuator
         robot.move(vl, vr, dt)  # Actuator
         # Advance
         t += dt
+        hud.set("time", t)
+        hud.set("wheel", vl, vr)
 
         ###################################################################################
 
         # Update scene
-        workspace.update()
+        if draw is None or draw():
+            workspace.update()
 
     
+    if not interactive:
+        workspace.close()
     print("Bye!")
-    return k_p, k_d, stored_errors
+    return controller.kp[0], controller.kd[0], stored_errors
 
 if __name__ == "__main__":
     kp, kd, se = main()
@@ -0,0 +1,104 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from eml4806.geometry.vector import vector, null, length, coincident, unit, perpendicular, ensure, append, Points2D
+
+# Baseline scalar formulas, applied one vector at a time
+
+def _length(v):
+    return np.linalg.norm(np.asarray(v))
+
+def _coincident(v1, v2, tol=1e-2):
+    return np.allclose(np.asarray(v1), np.asarray(v2), atol=tol)
+
+def _unit(v):
+    l = _length(v)
+    return np.array([0.0, 0.0]) if l <= 0 else np.asarray(v) / l
+
+def _perpendicular(v, clockwise=False):
+    return np.array([v[1], -v[0]]) if clockwise else np.array([-v[1], v[0]])
+
+SINGLES = [(3.0, 4.0), [1, 2], np.array([-0.5, 0.25]), (0.0, 0.0), np.array([1e-9, -2e9])]
+ROWS = np.random.default_rng(0).normal(scale=5.0, size=(64, 2))
+ROWS[3] = 0.0
+
+###############################################################################################
+
+def test_vector():
+    assert np.array_equal(vector(1.0, 2.0), [[1.0, 2.0]])
+    x, y = ROWS[:, 0], ROWS[:, 1]
+    assert np.array_equal(vector(x, y), np.column_stack((x, y)))
+    assert np.array_equal(vector(x, 1.0), np.column_stack((x, np.ones_like(x))))
+    out = np.empty_like(ROWS)
+    assert vector(x, y, out=out) is out
+
+@pytest.mark.parametrize("v", SINGLES)
+def test_single(v):
+    assert isinstance(length(v), float)
+    assert length(v) == pytest.approx(_length(v))
+    assert np.allclose(unit(v), _unit(v))
+    assert np.allclose(perpendicular(v), _perpendicular(np.asarray(v, dtype=float)))
+    assert np.allclose(perpendicular(v, clockwise=True), _perpendicular(np.asarray(v, dtype=float), True))
+    assert coincident(v, v) is True
+    w = np.asarray(v, dtype=float) + 0.5
+    assert coincident(v, w) == _coincident(v, w)
+
+def test_single_row():
+    # The (1, 2) arrays of vector() are rows, so row-wise results are (1,) arrays
+    v = vector(3.0, 4.0)
+    assert type(length(v)) is np.ndarray and length(v).shape == (1,)
+    assert np.array_equal(length(v), [_length(v)])
+    assert np.array_equal(coincident(v, vector(3.0, 4.005)), [True])
+    assert np.array_equal(coincident(v, vector(3.5, 4.0)), [False])
+    assert np.allclose(unit(v), [_unit(v[0])])
+
+def test_rows():
+    assert np.allclose(length(ROWS), [_length(v) for v in ROWS])
+    assert np.allclose(unit(ROWS), [_unit(v) for v in ROWS])
+    assert np.allclose(perpendicular(ROWS), [_perpendicular(v) for v in ROWS])
+    assert np.allclose(perpendicular(ROWS, clockwise=True), [_perpendicular(v, True) for v in ROWS])
+    assert np.allclose(perpendicular(ROWS, normalize=True), [_unit(_perpendicular(v)) for v in ROWS])
+    other = ROWS + np.where(np.arange(len(ROWS))[:, None] % 2, 0.005, 0.5)
+    assert np.array_equal(coincident(ROWS, other), [_coincident(a, b) for a, b in zip(ROWS, other)])
+
+def test_out_buffers():
+    out = np.empty(len(ROWS))
+    assert length(ROWS, out=out) is out
+    out = np.empty_like(ROWS)
+    assert unit(ROWS, out=out) is out
+    assert perpendicular(ROWS, out=out) is out
+    with pytest.raises(ValueError):
+        unit(ROWS, out=np.empty((3, 2)))
+    with pytest.raises(ValueError):
+        length(ROWS, out=np.empty(3))
+    out = np.empty((len(ROWS) + 1, 2))
+    assert append(ROWS, (1.0, 2.0), out=out) is out
+    assert np.array_equal(out, np.vstack((ROWS, [1.0, 2.0])))
+    with pytest.raises(ValueError):
+        append(ROWS, ROWS, out=out)
+    assert np.array_equal(null(), [0.0, 0.0])
+
+def test_ensure():
+    assert ensure(None).shape == (0, 2)
+    assert np.array_equal(ensure([1, 2, 3, 4]), [[1, 2], [3, 4]])
+    assert np.array_equal(ensure([[1, 2, 3], [4, 5, 6]]), [[1, 4], [2, 5], [3, 6]])
+    p = Points2D(ROWS)
+    assert ensure(p) is p.data
+    # Fast path only for contiguous float64 buffers
+    assert ensure(ROWS) is ROWS
+    ints = np.arange(8).reshape(4, 2)
+    assert ensure(ints).dtype == np.float64
+    e = ensure(np.asarray(ROWS.T.copy()).T)
+    assert e.flags.c_contiguous and np.array_equal(e, ROWS)
+
+def test_points2d_arithmetic():
+    p = Points2D(ROWS)
+    assert type(p - ROWS[0]) is np.ndarray and np.array_equal(p - ROWS[0], ROWS - ROWS[0])
+    assert np.array_equal(p[:, 0] * 2.0, ROWS[:, 0] * 2.0)
+    assert np.array_equal(np.hypot(p.x, p.y), length(ROWS))
+    assert np.array_equal(ROWS + p, 2 * ROWS)
@@ -0,0 +1,163 @@
+# Soak test of the project loops.
+#
+# Drives lawnmower.main and teleop.main headlessly with scripted key presses for hours of
+# simulated time, samples tracemalloc and the process RSS periodically and reports memory
+# growth per subsystem. Fails (exit code 1) when traced memory grows faster than the limit
+# per simulated hour, which catches unbounded buffers.
+#
+#   python soak.py lawnmower --hours 2 --limit 8 --draw 10
+#   python soak.py lawnmower teleop --hours 0.5
+#
+# Rendering a frame costs far more than a simulation tick, so frames are drawn every --draw
+# simulated seconds and always right before a sample, which still exercises artist growth.
+#
+# Each project ships its own eml4806 package, so every project runs in its own process.
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Project module, simulation step of its loop (s) and the key script replayed in a cycle
+# (None means no key pressed that tick)
+PROJECTS = {
+    "lawnmower": (0.1, ["up"] * 5 + [None] * 300 + ["d"] + [None] * 300 + ["p"] + [None] * 300
+                       + ["m"] + [None] * 600 + ["m", "p", "d"] + ["left"] * 3 + [None] * 300 + [" "]),
+    "teleop"   : (1.0, ["up"] * 20 + [None] * 300 + ["left"] * 10 + [None] * 600 + ["right"] * 20
+                       + [None] * 600 + ["down"] * 40 + [None] * 300 + [" "]),
+}
+
+MB = 1024.0 * 1024.0
+
+##############################################################################################
+
+def _rss():
+    # Resident set size in bytes, peak RSS where /proc is not available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+def _subsystem(filename, project):
+    path = filename.replace("\\", "/")
+    if "/eml4806/" in path:
+        parts = path.split("/eml4806/")[-1].split("/")
+        return "eml4806." + (parts[0] if len(parts) > 1 else os.path.splitext(parts[0])[0])
+    if path.endswith(f"/{project}.py"):
+        return project
+    for package in ("matplotlib", "numpy", "PIL"):
+        if f"/{package}/" in path:
+            return package
+    return "other"
+
+def _traced(project):
+    # Traced bytes per subsystem
+    sizes = {}
+    for stat in tracemalloc.take_snapshot().statistics("filename"):
+        name = _subsystem(stat.traceback[0].filename, project)
+        sizes[name] = sizes.get(name, 0) + stat.size
+    return sizes
+
+class ScriptedKeys:
+    """
+    Key source for a project main: replays the script, samples memory every `every`
+    ticks once past the warm-up, and quits after `ticks` ticks. draw() tells the main
+    which ticks to render: every `frames` ticks and the tick before each sample.
+    """
+
+    def __init__(self, project, script, ticks, every, warmup, frames=1):
+        self.project = project
+        self.script = script
+        self.ticks = ticks
+        self.every = every
+        self.warmup = warmup
+        self.frames = frames
+        self.tick = 0
+        self.samples = []   # (tick, rss, traced per subsystem)
+        self.started = time.perf_counter()
+
+    def _sampled(self, k):
+        return k >= self.warmup and (k - self.warmup) % self.every == 0 or k == self.ticks
+
+    def __call__(self):
+        k = self.tick
+        self.tick += 1
+        if self._sampled(k):
+            self.samples.append((k, _rss(), _traced(self.project)))
+        if k >= self.ticks:
+            return "q"
+        return self.script[k % len(self.script)]
+
+    def draw(self):
+        # Called during the tick that precedes self.tick
+        return self.tick % self.frames == 0 or self._sampled(self.tick)
+
+##############################################################################################
+
+def soak(project, hours, every, limit, warmup, draw):
+    dt, script = PROJECTS[project]
+    sys.path.insert(0, os.path.join(HERE, project))
+    import matplotlib
+    matplotlib.use("Agg")
+    module = __import__(project)
+
+    ticks = int(round(hours * 3600.0 / dt))
+    keys = ScriptedKeys(project, script, ticks, max(1, int(round(every / dt))), int(round(warmup / dt)),
+                        max(1, int(round(draw / dt))))
+    tracemalloc.start()
+    module.main(keys=keys, interactive=False, draw=keys.draw)
+    tracemalloc.stop()
+
+    if len(keys.samples) < 2:
+        print(f"{project}: not enough samples, run for longer than the warm-up.")
+        return False
+    t0, rss0, traced0 = keys.samples[0]
+    t1, rss1, traced1 = keys.samples[-1]
+    span = (t1 - t0) * dt / 3600.0  # simulated hours
+    print(f"{project}: {ticks} ticks, {hours:g} h simulated in {time.perf_counter() - keys.started:.0f} s, "
+          f"{len(keys.samples)} samples")
+    print(f"  {'subsystem':<20}{'start (MB)':>12}{'end (MB)':>12}{'MB/hour':>12}")
+    total = 0.0
+    for name in sorted(set(traced0) | set(traced1)):
+        a, b = traced0.get(name, 0) / MB, traced1.get(name, 0) / MB
+        total += (b - a) / span
+        print(f"  {name:<20}{a:>12.3f}{b:>12.3f}{(b - a) / span:>12.3f}")
+    print(f"  {'traced':<20}{sum(traced0.values()) / MB:>12.3f}{sum(traced1.values()) / MB:>12.3f}{total:>12.3f}")
+    print(f"  {'rss':<20}{rss0 / MB:>12.3f}{rss1 / MB:>12.3f}{(rss1 - rss0) / MB / span:>12.3f}")
+    if total > limit:
+        print(f"  FAIL: traced memory grows {total:.3f} MB per simulated hour, limit {limit:g}")
+        return False
+    print(f"  OK: traced memory grows {total:.3f} MB per simulated hour, limit {limit:g}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test of the project loops.")
+    parser.add_argument("projects", nargs="+", choices=sorted(PROJECTS))
+    parser.add_argument("--hours", type=float, default=1.0, help="simulated hours per project")
+    parser.add_argument("--every", type=float, default=60.0, help="sampling period (simulated s)")
+    parser.add_argument("--warmup", type=float, default=120.0, help="simulated s before the first sample")
+    parser.add_argument("--limit", type=float, default=4.0, help="allowed growth (MB per simulated hour)")
+    parser.add_argument("--draw", type=float, default=10.0, help="rendering period (simulated s)")
+    args = parser.parse_args()
+
+    if len(args.projects) == 1:
+        return 0 if soak(args.projects[0], args.hours, args.every, args.limit, args.warmup, args.draw) else 1
+
+    # One process per project
+    failed = 0
+    for project in args.projects:
+        command = [sys.executable, os.path.abspath(__file__), project, "--hours", str(args.hours),
+                   "--every", str(args.every), "--warmup", str(args.warmup), "--limit", str(args.limit),
+                   "--draw", str(args.draw)]
+        failed += subprocess.call(command) != 0
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
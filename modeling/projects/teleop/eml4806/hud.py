@@ -0,0 +1,47 @@
+import time
+
+##############################################################################################
+
+# Copy of modeling/projects/lawnmower/eml4806/graphics/hud.py as of commit 02bdf68, identical
+# below this header. Every project ships its own eml4806 package and runs on its own, so the
+# copy is kept here on purpose; to sync, diff the source against that commit, apply the same
+# changes here and update the commit above.
+
+class Hud:
+    """
+    Heads-up display: a fixed set of text slots drawn over the axes.
+
+    Slots are given as {name: format}, e.g. {"error": "Error {:8.4f} m"}, and formatted with
+    fixed widths so the text keeps its size. set() only stores values and can run at the
+    physics rate; refresh() formats them at most once per period (wall-clock seconds) and
+    re-lays out a text artist only when its string actually changed.
+    """
+
+    def __init__(self, axis, slots, period=0.2, x=0.02, y=0.98, size=10):
+        self.period = float(period)
+        self._formats = dict(slots)
+        self._values = {name: None for name in self._formats}
+        self._shown = {name: "" for name in self._formats}
+        self._last = -float("inf")
+        self._texts = {}
+        step = 1.6 * size / (72.0 * axis.figure.get_figheight() * axis.get_position().height)
+        for k, name in enumerate(self._formats):
+            self._texts[name] = axis.text(x, y - k * step, "", transform=axis.transAxes, va="top", ha="left",
+                                          family="monospace", fontsize=size, zorder=10,
+                                          bbox=dict(facecolor="white", alpha=0.6, edgecolor="none"))
+
+    def set(self, name, *values):
+        self._values[name] = values
+
+    def refresh(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last < self.period:
+            return
+        self._last = now
+        for name, values in self._values.items():
+            if values is None:
+                continue
+            text = self._formats[name].format(*values)
+            if text != self._shown[name]:
+                self._shown[name] = text
+                self._texts[name].set_text(text)
@@ -0,0 +1,58 @@
+import numpy as np
+
+from eml4806.math import wrap_angle
+
+class Swarm:
+    """
+    N unicycle particles integrated together as (N,) arrays.
+    Positions are kept in one (N, 2) buffer so they can be handed to a scatter as offsets.
+    Commands are shared scalars or per-particle (N,) arrays.
+    """
+
+    def __init__(self, x, y, theta, bounds, vmax, wmax, margin=0.98):
+        x, y, theta = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float),
+                                          np.asarray(theta, dtype=float))
+        n = x.size
+        self.count = n
+        self.positions = np.column_stack((x.ravel(), y.ravel()))
+        self.theta = wrap_angle(theta.ravel().copy())
+        self.v = np.zeros(n)
+        self.w = np.zeros(n)
+        self.vmax = float(vmax)
+        self.wmax = float(wmax)
+        # Particles are kept inside a margin of the bounds
+        xmin, xmax, ymin, ymax = bounds
+        self._lower = np.array([margin*xmin, margin*ymin])
+        self._upper = np.array([margin*xmax, margin*ymax])
+        # Scratch buffers, reused every step
+        self._c = np.empty(n)
+        self._s = np.empty(n)
+
+    @property
+    def x(self):
+        return self.positions[:, 0]
+
+    @property
+    def y(self):
+        return self.positions[:, 1]
+
+    def command(self, v, w):
+        np.clip(v, -self.vmax, self.vmax, out=self.v)
+        np.clip(w, -self.wmax, self.wmax, out=self.w)
+
+    def step(self, dt):
+        # Digital odometric localization
+        c, s = self._c, self._s
+        np.cos(self.theta, out=c)
+        np.sin(self.theta, out=s)
+        c *= self.v
+        s *= self.v
+        c *= dt
+        s *= dt
+        self.positions[:, 0] += c
+        self.positions[:, 1] += s
+        np.multiply(self.w, dt, out=c)
+        self.theta += c
+        # Limit pose
+        np.clip(self.positions, self._lower, self._upper, out=self.positions)
+        np.mod(self.theta, 2*np.pi, out=self.theta)
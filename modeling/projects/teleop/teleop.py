@@ -1,25 +1,28 @@
-# Simulate a particle moving around a circle.
+# Simulate a swarm of particles driven from the keyboard.
 
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 import eml4806.input as inp
+from eml4806.swarm import Swarm
+from eml4806.hud import Hud
 
-def wrap_angle(theta):
-    return np.mod(theta, 2*np.pi)
-
-def main():
+# keys      : source of key presses, one call per tick (scripted input for soak tests)
+# interactive: headless runs never open a window
+# draw      : optional predicate deciding whether a headless tick is rendered (every tick by default)
+def main(count=1, keys=inp.read_key, interactive=True, draw=None):
 
     #eml.info()
-    
-    # Robot initial condition    
+
+    # Robot initial condition, particles start at the origin with their headings fanned out
     x = 0.0 # m
     y = 0.0 # m
-    theta = np.pi/2.0 # rad
+    theta = np.pi/2.0 + 2.0*np.pi*np.arange(count)/count # rad
 
-    # Kinematics
+    # Kinematics, shared by every particle
     v = 0.0 # m/s
     w = 0.0 # rad/s
-    
+
     # Simulation
     dt = 1.0 # s
     dv = 0.01 # m/s
@@ -28,37 +31,41 @@ def main():
     # Robot specifications
     vmax = 1.0   # m/s
     wmax = 2.0*np.pi # rad/s
-    
+
     # Workspace
     xmin = -100.0
     xmax =  100.0
     ymin = -100.0
     ymax =  100.0
-   
-    # Decoration
+
+    swarm = Swarm(x, y, theta, (xmin, xmax, ymin, ymax), vmax, wmax)
+
+    # Decoration, trail of the first particle kept in a ring buffer
     trail_size = 500
-    trail_x = np.array([x])
-    trail_y = np.array([y])
+    trail_xy = np.tile(swarm.positions[0], (trail_size, 1))
+    trail_head = 0
 
     # Create graphics
-    plt.ion()
+    if interactive:
+        plt.ion()
     fig, ax = plt.subplots(figsize=(8, 8))
     ax.set_xlim(xmin, xmax)
     ax.set_ylim(ymin, ymax)
     ax.set_aspect("equal")
     ax.grid(True)
 
-    # Draw robot
-    (trail,) = ax.plot([x], [y], "-", linewidth=3.0, alpha=0.5, label="trail")
-    (particle,) = ax.plot(trail_x, trail_y, "o", markersize=8, alpha=1.0, label="particle")
+    # Draw robots
+    (trail,) = ax.plot(trail_xy[:, 0], trail_xy[:, 1], "-", linewidth=3.0, alpha=0.5, label="trail")
+    particles = ax.scatter(swarm.x, swarm.y, s=64 if count == 1 else 4, alpha=1.0, label="particles")
 
-    # Finish decoration   
-    ax.legend()
+    # Finish decoration
+    ax.legend(loc="upper right")
+    hud = Hud(ax, {"command": "v {:+6.3f} m/s  w {:+7.4f} rad/s"})
 
     while True:
 
         # Commands
-        key = inp.read_key()
+        key = keys()
 
         if key == 'q':
             break
@@ -80,37 +87,36 @@ def main():
         v = np.clip(v, -vmax, vmax)
         w = np.clip(w, -wmax, wmax)
 
-        # Digital odometric localization
-        x = x + v*dt*np.cos(theta)
-        y = y + v*dt*np.sin(theta)
-        theta = theta + w*dt
+        # Digital odometric localization, bounded and wrapped by the swarm
+        swarm.command(v, w)
+        swarm.step(dt)
 
-        # Limit pose
-        x = np.clip(x, 0.98*xmin, 0.98*xmax)
-        y = np.clip(y, 0.98*ymin, 0.98*ymax)
-        tetha = wrap_angle(theta)
-
-        # Update particle
-        particle.set_data([x], [y])
+        # Update particles
+        particles.set_offsets(swarm.positions)
 
         # Update trail
-        trail_x = np.append(trail_x, x)
-        trail_y = np.append(trail_y, y)
-        if len(trail_x) > trail_size:
-            trail_x = trail_x[-trail_size:]
-            trail_y = trail_y[-trail_size:]
-        trail.set_data(trail_x, trail_y)
+        trail_xy[trail_head] = swarm.positions[0]
+        trail_head = (trail_head + 1) % trail_size
+        ordered = np.roll(trail_xy, -trail_head, axis=0)
+        trail.set_data(ordered[:, 0], ordered[:, 1])
 
-        # Upate 
-        fig.supxlabel(f'v: {v} w: {w}')
+        # Upate, the overlay re-lays out its text only when it changes
+        hud.set("command", v, w)
+        hud.refresh()
 
         # Update graphics
-        plt.pause(0.00001)
+        if interactive:
+            plt.pause(0.00001)
+        elif draw is None or draw():
+            fig.canvas.draw()
+
+    if interactive:
+        plt.ioff()
+        plt.show()
+    else:
+        plt.close(fig)
 
-    plt.ioff()
-    plt.show()
-    
     print("Bye!")
 
 if __name__ == "__main__":
-    main()
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1)